@@ -2,22 +2,53 @@
 
 import autorig.control_rig.module.utils as module_utils
 import autorig.control_rig.feature.FK_utils as FK_utils
+import autorig.control_rig.module.guides as module_guides
+import autorig.control_rig.module.create_node as create_node
+import autorig.control_rig.module.node_handle as node_handle
 
 from autorig.control_rig.feature.base import FeatureBase
 
 class FeatureFK(FeatureBase):
     feature_name = "FK"
 
+    #Placed nodes whose matrices can be stored and reapplied on rebuild.
+    guide_feature_types = ("FK_root", "FK_guide", "FK_primaryAim", "FK_secondaryAim")
+
+    #Modules the feature builds its nodes with, hashed into the build cache key.
+    source_modules = (FK_utils, module_guides, create_node, node_handle)
+
+    #Every featureType the feature creates, used to tear it down by tag.
+    feature_node_types = guide_feature_types + ("FK_control", "FK_joint", "FK_aim_matrix", "FK_aim_inverse_matrix",
+                                                "FK_POM_mult_matrix", "FK_WM_mult_matrix")
+
     def create(self, instance_module, ID_list):
         root_loc,link_data = self.create_chain(instance_module, ID_list)        
-        self.parent_FK_nodes(root_loc,link_data)
+        self.parent_FK_nodes(instance_module,root_loc,link_data)
+
+    #Proxy chains have no guides or aim network, only controls driving FK joints.
+    def create_proxy(self, instance_module, ID_list):
+        FK_utils.create_FK_proxy_chain(ID_list, module_name=instance_module.instance_module_name,
+                                       parenting_queue=instance_module.pending_parents)
+
+    #Builds the full chain over a proxy chain, keeping the proxy controls and their animation. The proxy FK joints are
+    #replaced, so the new ones are attached again the same way add_feature attaches a fresh build.
+    def upgrade(self, instance_module, ID_list):
+        proxy_controls = FK_utils.prepare_FK_proxy_upgrade(instance_module.instance_module_name)
+        if not proxy_controls:
+            return
+        root_loc,link_data = self.create_chain(instance_module, ID_list, proxy_controls)
+        self.parent_FK_nodes(instance_module,root_loc,link_data)
+        instance_module.flush_parenting(force=True)
+        self.attach(instance_module)
 
-    def create_chain(self, instance_module, ID_list):       
+    def create_chain(self, instance_module, ID_list, proxy_controls=None):       
         root_loc, link_data = FK_utils.create_FK_chain(ID_list, 
                                     aim_direction = 1,
                                     module_name=instance_module.instance_module_name,
+                                    guide_matrices=module_guides.get_valid_guides(instance_module),
+                                    proxy_controls=proxy_controls,
                                     )
         return root_loc, link_data
         
-    def parent_FK_nodes(self,root_loc,link_data):
-        FK_utils.parent_FK_nodes(root_loc,link_data)      
+    def parent_FK_nodes(self,instance_module,root_loc,link_data):
+        FK_utils.parent_FK_nodes(root_loc,link_data,instance_module.pending_parents)      
@@ -0,0 +1,233 @@
+#Evaluates the matrix network built by the FK feature outside of Maya. A captured FK network (see
+#FK_utils.capture_FK_network) is enough to compute FK joint world matrices for any number of control poses at once,
+#which lets bind pose and pose following be checked in CI, and gives a reference cost to compare rig variants against.
+#
+#Matrices follow Maya's row vector convention, so "A * B" applies A first and a multMatrix sums matrixIn[0] * matrixIn[1].
+#Every array is stacked along its leading axes, ex. control poses are (poses, links, 4, 4).
+#
+#Per link the network is:
+#   aim        = aimMatrix(guide world, primary target, secondary target)
+#   POM        = aim * inverse(previous aim)
+#   WM         = POM * previous control world
+#   control    = control local * WM * control group world
+#   FK joint   = control world * joint group world
+#Guides don't move with the controls, so the aim and POM matrices are solved once and only the control chain is
+#evaluated per pose.
+
+import argparse
+import json
+import time
+import numpy as np
+from dataclasses import dataclass
+
+EPSILON = 1e-8
+
+@dataclass
+class FKNetwork:
+    link_names: list[str]
+    guide_matrices: np.ndarray
+    primary_targets: np.ndarray
+    secondary_targets: np.ndarray
+    primary_axis: np.ndarray
+    secondary_axis: np.ndarray
+    control_parent: np.ndarray
+    joint_parent: np.ndarray
+    control_matrices: np.ndarray
+    joint_matrices: np.ndarray
+    bind_matrices: np.ndarray|None = None
+
+def to_matrices(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64).reshape(-1, 4, 4)
+
+def network_from_data(data: dict) -> FKNetwork:
+    return FKNetwork(link_names = list(data["link_names"]),
+                     guide_matrices = to_matrices(data["guide_matrices"]),
+                     primary_targets = to_matrices(data["primary_matrices"])[:, 3, :3],
+                     secondary_targets = to_matrices(data["secondary_matrices"])[:, 3, :3],
+                     primary_axis = np.asarray(data["primary_axis"], dtype=np.float64).reshape(-1, 3),
+                     secondary_axis = np.asarray(data["secondary_axis"], dtype=np.float64).reshape(-1, 3),
+                     control_parent = to_matrices(data["control_parent"])[0],
+                     joint_parent = to_matrices(data["joint_parent"])[0],
+                     control_matrices = to_matrices(data["control_matrices"]),
+                     joint_matrices = to_matrices(data["joint_matrices"]),
+                     bind_matrices = to_matrices(data["bind_matrices"]) if data.get("bind_matrices") else None)
+
+def read_network(file_path: str) -> FKNetwork:
+    with open(file_path, "r") as f:
+        return network_from_data(json.load(f))
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    length = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(length < EPSILON, 1.0, length)
+
+#aimMatrix with both modes set to Aim. The primary input axis points at the primary target and the secondary input axis
+#points as close to the secondary target as it can while staying perpendicular. Input axes are in the input matrix's
+#local space. A target sitting on the input position leaves that axis as it was on the input matrix. Translation and
+#scale come from the input matrix.
+
+def aim_matrix(input_matrices: np.ndarray, primary_targets: np.ndarray, secondary_targets: np.ndarray,
+               primary_axis: np.ndarray, secondary_axis: np.ndarray) -> np.ndarray:
+    rotation = input_matrices[..., :3, :3]
+    scale = np.linalg.norm(rotation, axis=-1, keepdims=True)
+    rotation = rotation / np.where(scale < EPSILON, 1.0, scale)
+    position = input_matrices[..., 3, :3]
+
+    local_primary = normalize(primary_axis)
+    local_secondary = normalize(secondary_axis - np.sum(secondary_axis * local_primary, axis=-1, keepdims=True) * local_primary)
+
+    input_primary = np.einsum("...i,...ij->...j", local_primary, rotation)
+    input_secondary = np.einsum("...i,...ij->...j", local_secondary, rotation)
+
+    primary = primary_targets - position
+    primary_length = np.linalg.norm(primary, axis=-1, keepdims=True)
+    primary = np.where(primary_length < EPSILON, input_primary, primary / np.where(primary_length < EPSILON, 1.0, primary_length))
+
+    secondary = secondary_targets - position
+    secondary = secondary - np.sum(secondary * primary, axis=-1, keepdims=True) * primary
+    secondary_length = np.linalg.norm(secondary, axis=-1, keepdims=True)
+    secondary = np.where(secondary_length < EPSILON, input_secondary, secondary / np.where(secondary_length < EPSILON, 1.0, secondary_length))
+
+    #The local frame built from the input axes is orthonormal, so its transpose maps it back to the identity.
+    local_frame = np.stack([local_primary, local_secondary, np.cross(local_primary, local_secondary)], axis=-2)
+    world_frame = np.stack([primary, secondary, np.cross(primary, secondary)], axis=-2)
+    local_frame = np.broadcast_to(local_frame, world_frame.shape)
+
+    output = np.zeros(np.broadcast_shapes(input_matrices.shape, world_frame.shape[:-2] + (4, 4)))
+    output[..., :3, :3] = scale * np.matmul(np.swapaxes(local_frame, -1, -2), world_frame)
+    output[..., 3, :3] = position
+    output[..., 3, 3] = 1.0
+    return output
+
+#Everything upstream of the controls, solved once per network.
+
+def solve_offsets(network: FKNetwork) -> np.ndarray:
+    aim = aim_matrix(network.guide_matrices, network.primary_targets, network.secondary_targets,
+                     network.primary_axis, network.secondary_axis)
+    offsets = aim.copy()
+    offsets[1:] = np.matmul(aim[1:], np.linalg.inv(aim[:-1]))
+    return offsets
+
+#Control locals are (poses, links, 4, 4). Returns FK joint world matrices in the same shape.
+
+def evaluate_FK(network: FKNetwork, control_locals: np.ndarray, offsets: np.ndarray|None = None) -> np.ndarray:
+    control_locals = np.asarray(control_locals, dtype=np.float64)
+    if offsets is None:
+        offsets = solve_offsets(network)
+
+    control_worlds = np.empty_like(control_locals)
+    previous = None
+    for i in range(len(network.link_names)):
+        world_offset = offsets[i] if previous is None else np.matmul(offsets[i], previous)
+        previous = np.matmul(np.matmul(control_locals[:, i], world_offset), network.control_parent)
+        control_worlds[:, i] = previous
+
+    return np.matmul(control_worlds, network.joint_parent)
+
+#Rest pose is every control zeroed.
+
+def evaluate_rest(network: FKNetwork) -> np.ndarray:
+    control_locals = np.broadcast_to(np.identity(4), (1, len(network.link_names), 4, 4))
+    return evaluate_FK(network, control_locals)[0]
+
+#Local matrices from translate, rotate in degrees and scale with Maya's xyz rotate order, stacked along leading axes.
+
+def compose_matrices(translate: np.ndarray, rotate: np.ndarray, scale: np.ndarray|None = None) -> np.ndarray:
+    translate = np.asarray(translate, dtype=np.float64)
+    x, y, z = np.moveaxis(np.radians(np.asarray(rotate, dtype=np.float64)), -1, 0)
+    shape = translate.shape[:-1]
+
+    def rotation(angle, axis):
+        matrix = np.zeros(shape + (3, 3))
+        a, b = (axis + 1) % 3, (axis + 2) % 3
+        matrix[..., axis, axis] = 1.0
+        matrix[..., a, a] = np.cos(angle)
+        matrix[..., a, b] = np.sin(angle)
+        matrix[..., b, a] = -np.sin(angle)
+        matrix[..., b, b] = np.cos(angle)
+        return matrix
+
+    matrices = np.zeros(shape + (4, 4))
+    matrices[..., :3, :3] = np.matmul(np.matmul(rotation(x, 0), rotation(y, 1)), rotation(z, 2))
+    if scale is not None:
+        matrices[..., :3, :3] *= np.asarray(scale, dtype=np.float64)[..., np.newaxis]
+    matrices[..., 3, :3] = translate
+    matrices[..., 3, 3] = 1.0
+    return matrices
+
+def random_control_poses(network: FKNetwork, pose_count: int, max_angle: float = 45.0, seed: int = 0) -> np.ndarray:
+    generator = np.random.default_rng(seed)
+    link_count = len(network.link_names)
+    rotate = generator.uniform(-max_angle, max_angle, (pose_count, link_count, 3))
+    return compose_matrices(np.zeros((pose_count, link_count, 3)), rotate)
+
+#Largest absolute element difference per link, taken over every pose.
+
+def matrix_error(result: np.ndarray, expected: np.ndarray) -> np.ndarray:
+    difference = np.abs(np.asarray(result) - np.asarray(expected))
+    return difference.reshape(-1, difference.shape[-3], 16).max(axis=(0, 2))
+
+#Returns {link: error} for every link whose rest pose FK joint doesn't land on its bind joint.
+
+def validate_bind_pose(network: FKNetwork, tolerance: float = 1e-4) -> dict[str, float]:
+    if network.bind_matrices is None:
+        raise ValueError("FK network was captured without bind matrices.")
+    errors = matrix_error(evaluate_rest(network), network.bind_matrices)
+    return {link: float(error) for link, error in zip(network.link_names, errors) if error > tolerance}
+
+#Returns {link: error} for every link whose evaluated pose set doesn't match the expected FK joint matrices, ex. ones
+#read back from Maya for the same control poses.
+
+def validate_poses(network: FKNetwork, control_locals: np.ndarray, expected: np.ndarray,
+                   tolerance: float = 1e-4) -> dict[str, float]:
+    errors = matrix_error(evaluate_FK(network, control_locals), expected)
+    return {link: float(error) for link, error in zip(network.link_names, errors) if error > tolerance}
+
+#The pose the network was captured in has to come out the same as it did in Maya.
+
+def validate_captured_pose(network: FKNetwork, tolerance: float = 1e-4) -> dict[str, float]:
+    return validate_poses(network, network.control_matrices[np.newaxis], network.joint_matrices[np.newaxis], tolerance)
+
+def time_evaluation(network: FKNetwork, pose_count: int = 10000, repeat: int = 5, seed: int = 0) -> dict:
+    control_locals = random_control_poses(network, pose_count, seed=seed)
+
+    start = time.perf_counter()
+    offsets = solve_offsets(network)
+    solve_time = time.perf_counter() - start
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        evaluate_FK(network, control_locals, offsets)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {"links": len(network.link_names),
+            "poses": pose_count,
+            "solve_offsets": solve_time,
+            "evaluate": best,
+            "per_pose": best / pose_count}
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and time a captured FK network without Maya.")
+    parser.add_argument("network_path")
+    parser.add_argument("--poses", type=int, default=10000)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    network = read_network(args.network_path)
+
+    failed = validate_captured_pose(network, args.tolerance)
+    for link, error in failed.items():
+        print(f"{link} doesn't match its captured FK joint, off by {error:.6f}.")
+
+    if network.bind_matrices is not None:
+        bind_failed = validate_bind_pose(network, args.tolerance)
+        for link, error in bind_failed.items():
+            print(f"{link} is off its bind joint by {error:.6f}.")
+        failed.update(bind_failed)
+
+    print(json.dumps(time_evaluation(network, args.poses), indent=4))
+    raise SystemExit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
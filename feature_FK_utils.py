@@ -1,31 +1,37 @@
 #Logic for FK feature
 
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
 from dataclasses import dataclass
 
 import autorig.control_rig.module.create_node as create_node
 import autorig.control_rig.module.query as module_query
+import autorig.control_rig.module.guides as module_guides
+import autorig.control_rig.module.tag_index as tag_index
 
-#I use dataclasses to hold name references to all nodes created in features. This is useful when parenting everything
-#organizationally in the outliner at the end of creation.
+from autorig.control_rig.module.node_handle import NodeHandle, ConnectionBatch
+
+#I use dataclasses to hold references to all nodes created in features. This is useful when parenting everything
+#organizationally in the outliner at the end of creation. Nodes are held as handles so they keep working if a node is
+#renamed, and their plugs are only looked up once.
 
 @dataclass
 class FKLinkData:
     module_name: str
     link_name: str
-    guide_locator: str
-    FK_control: str
-    bind_joint: str
-    driver_joint: str
-    FK_joint: str
+    guide_locator: NodeHandle
+    FK_control: NodeHandle
+    bind_joint: NodeHandle
+    driver_joint: NodeHandle
+    FK_joint: NodeHandle
 
     #optional for chains
-    aim_primary_locator: str|None = None
-    aim_secondary_locator: str|None = None
-    aim_matrix: str|None = None
-    aim_inverse_matrix: str|None = None
-    parent_offset_mult_matrix: str|None = None
-    world_mult_matrix: str|None = None
+    aim_primary_locator: NodeHandle|None = None
+    aim_secondary_locator: NodeHandle|None = None
+    aim_matrix: NodeHandle|None = None
+    aim_inverse_matrix: NodeHandle|None = None
+    parent_offset_mult_matrix: NodeHandle|None = None
+    world_mult_matrix: NodeHandle|None = None
 
 def create_FK_aim_data(data_cls: FKLinkData) -> FKLinkData:
     aim_matrix = create_node.create_module_node('aimMatrix', 
@@ -39,10 +45,12 @@ def create_FK_aim_data(data_cls: FKLinkData) -> FKLinkData:
                                             'featureType': 'FK_aim_inverse_matrix'})
 
     aim_primary_locator = create_node.create_module_locator(f"{data_cls.link_name}_FK_primary_aim", {'moduleParent': data_cls.module_name,
-                                              'featureType':"FK_primaryAim"})
+                                              'featureType':"FK_primaryAim",
+                                              'jointID': data_cls.link_name})
     
     aim_secondary_locator = create_node.create_module_locator(f"{data_cls.link_name}_FK_secondary_aim", {'moduleParent': data_cls.module_name,
-                                              'featureType':"FK_secondaryAim"})
+                                              'featureType':"FK_secondaryAim",
+                                              'jointID': data_cls.link_name})
     
     parent_offset_mult_matrix = create_node.create_module_node("multMatrix", 
                                                    f"{data_cls.link_name}_FK_ctrl_POM",
@@ -54,16 +62,16 @@ def create_FK_aim_data(data_cls: FKLinkData) -> FKLinkData:
                                            {'moduleParent': data_cls.module_name,
                                             'featureType': 'FK_WM_mult_matrix'})
 
-    data_cls.aim_primary_locator = aim_primary_locator
-    data_cls.aim_secondary_locator = aim_secondary_locator
-    data_cls.aim_matrix = aim_matrix
-    data_cls.aim_inverse_matrix = aim_inverse_matrix
-    data_cls.parent_offset_mult_matrix = parent_offset_mult_matrix
-    data_cls.world_mult_matrix = world_mult_matrix
+    data_cls.aim_primary_locator = NodeHandle(aim_primary_locator)
+    data_cls.aim_secondary_locator = NodeHandle(aim_secondary_locator)
+    data_cls.aim_matrix = NodeHandle(aim_matrix)
+    data_cls.aim_inverse_matrix = NodeHandle(aim_inverse_matrix)
+    data_cls.parent_offset_mult_matrix = NodeHandle(parent_offset_mult_matrix)
+    data_cls.world_mult_matrix = NodeHandle(world_mult_matrix)
 
     return data_cls
 
-def create_FK_link_data(link_name: str, module_name: str) -> FKLinkData:
+def create_FK_link_data(link_name: str, module_name: str, FK_control: NodeHandle|None = None) -> FKLinkData:
     bind_joint = module_query.find_single_node({"jointID": link_name,
                                                 "featureType": 'bind_joint'})
 
@@ -76,11 +84,14 @@ def create_FK_link_data(link_name: str, module_name: str) -> FKLinkData:
         cmds.error(f"No driver joint ID in scene matches {link_name}.")
 
     guide_locator = create_node.create_module_locator(f"{link_name}_FK_guide", {'moduleParent': module_name,
-                                              'featureType':"FK_guide"})
+                                              'featureType':"FK_guide",
+                                              'jointID': link_name})
     
-    FK_control = create_node.create_placeholder_curve(f"{link_name}_FK_ctrl", {'moduleParent': module_name,
+    #Controls kept from a proxy build are reused so their animation carries over.
+    if not FK_control:
+        FK_control = NodeHandle(create_node.create_placeholder_curve(f"{link_name}_FK_ctrl", {'moduleParent': module_name,
                                               'featureType':"FK_control",
-                                              'controlID': link_name})
+                                              'controlID': link_name}))
     
     FK_joint = create_node.create_module_node('joint', f"{link_name}_FK_joint", {'moduleParent': module_name,
                                               'featureType':"FK_joint",
@@ -89,141 +100,318 @@ def create_FK_link_data(link_name: str, module_name: str) -> FKLinkData:
     return FKLinkData(
         module_name = module_name,
         link_name = link_name,
-        guide_locator = guide_locator,
+        guide_locator = NodeHandle(guide_locator),
         FK_control = FK_control,
-        bind_joint = bind_joint,
-        driver_joint = driver_joint,
-        FK_joint = FK_joint
+        bind_joint = NodeHandle(bind_joint),
+        driver_joint = NodeHandle(driver_joint),
+        FK_joint = NodeHandle(FK_joint)
     )
 
 #FK chains are made by creating "links." Links are a set of driver joint, FK joint, NURBS curve, and guide locators.
+#Connections and attribute values are added to the batch when one is passed in, otherwise the link applies its own.
 
-def create_FK_link(link_name: str, module_name: str,match_bind: bool =False) -> str:
-    link_data = create_FK_link_data(link_name,module_name)
+def create_FK_link(link_name: str, module_name: str,match_bind: bool =False, place_guide: bool = True,
+                   batch: ConnectionBatch|None = None, FK_control: NodeHandle|None = None) -> FKLinkData:
+    link_data = create_FK_link_data(link_name,module_name,FK_control)
+    link_batch = batch or ConnectionBatch()
 
-    if match_bind:
-        cmds.matchTransform(link_data.guide_locator, link_data.bind_joint)
-    else:
-        cmds.matchTransform(link_data.guide_locator, link_data.bind_joint, pos=True)
+    if place_guide:
+        if match_bind:
+            cmds.matchTransform(link_data.guide_locator.name, link_data.bind_joint.name)
+        else:
+            cmds.matchTransform(link_data.guide_locator.name, link_data.bind_joint.name, pos=True)
 
-    cmds.setAttr(f"{link_data.guide_locator}.visibility", 0)
-    cmds.setAttr(f"{link_data.guide_locator}.visibility", keyable=False, channelBox=False)
+    link_batch.set(link_data.guide_locator, "visibility", False)
+    link_batch.hide(link_data.guide_locator)
     
-    cmds.setAttr(f"{link_data.FK_control}.visibility", keyable=False, channelBox=False)
+    link_batch.hide(link_data.FK_control)
 
     cmds.delete(constructionHistory=True)
     cmds.select(clear=True)
 
-    cmds.connectAttr(f"{link_data.guide_locator}.worldMatrix[0]", f"{link_data.FK_control}.offsetParentMatrix")
+    link_batch.connect(link_data.guide_locator, "worldMatrix[0]", link_data.FK_control, "offsetParentMatrix")
 
-    cmds.connectAttr(f"{link_data.FK_control}.worldMatrix[0]", f"{link_data.FK_joint}.offsetParentMatrix")
+    link_batch.connect(link_data.FK_control, "worldMatrix[0]", link_data.FK_joint, "offsetParentMatrix")
     
-    cmds.setAttr(f"{link_data.FK_joint}.visibility", 0)
-    cmds.setAttr(f"{link_data.driver_joint}.visibility", 0)
+    link_batch.set(link_data.FK_joint, "visibility", False)
+    link_batch.set(link_data.driver_joint, "visibility", False)
 
-    cmds.setAttr(f"{link_data.FK_joint}.visibility", keyable=False, channelBox=False)
+    link_batch.hide(link_data.FK_joint)
+
+    if not batch:
+        link_batch.apply()
 
     return link_data
 
-def create_FK_chain(link_names: list[str], aim_direction: float, module_name: str, keep_end_control: bool = True):
+#Guide matrices stored from a previous build against the same skeleton replace placement. Any guide without a stored
+#matrix is still placed from its driver joint.
+#
+#The chain is built in three passes: create nodes and the connections that guides are placed relative to, place the
+#guides, then connect the aim matrix network. Each pass applies its connections in one batch.
+
+def create_FK_chain(link_names: list[str], aim_direction: float, module_name: str, keep_end_control: bool = True,
+                    guide_matrices: dict|None = None, proxy_controls: dict|None = None):
+    stored_matrices = {}
+    batch = ConnectionBatch()
     
     #create all nodes and assign them to FKLinkData dataclass
-    root_locator = create_node.create_module_locator(f"{link_names[0]}_FK_root", {'moduleParent': module_name,
-                                              'featureType':"FK_root"})
+    root_locator = NodeHandle(create_node.create_module_locator(f"{link_names[0]}_FK_root", {'moduleParent': module_name,
+                                              'featureType':"FK_root",
+                                              'jointID': link_names[0]}))
     
-    driver_joint = module_query.find_single_node({"jointID": link_names[0],
-                                                  "featureType": 'driver_joint'})
-    
-    module_locator = module_query.find_single_node({"moduleParent": module_name,
-                                                           "featureType": "module_root"})
+    module_locator = NodeHandle(module_query.find_single_node({"moduleParent": module_name,
+                                                           "featureType": "module_root"}))
                                                           
-    cmds.connectAttr(f"{module_locator}.worldMatrix[0]", f"{root_locator}.offsetParentMatrix")
-    cmds.matchTransform(root_locator,driver_joint, position=True)
+    batch.connect(module_locator, "worldMatrix[0]", root_locator, "offsetParentMatrix")
 
     link_data = []
     for i,link in enumerate(link_names):
-        link_data_cls = create_FK_link(link, module_name)
+        link_data_cls = create_FK_link(link, module_name,
+                                       place_guide=not module_guides.get_guide_matrix(guide_matrices, link, "FK_guide"),
+                                       batch=batch,
+                                       FK_control=(proxy_controls or {}).get(link))
         link_data_cls = create_FK_aim_data(link_data_cls)
 
-        cmds.setAttr(f"{link_data_cls.aim_primary_locator}.visibility", 0)
-        cmds.setAttr(f"{link_data_cls.aim_secondary_locator}.visibility", 0)
-
-        cmds.connectAttr(f"{root_locator}.worldMatrix[0]", f"{link_data_cls.aim_primary_locator}.offsetParentMatrix")
-        cmds.connectAttr(f"{root_locator}.worldMatrix[0]", f"{link_data_cls.aim_secondary_locator}.offsetParentMatrix")
+        batch.set(link_data_cls.aim_primary_locator, "visibility", False)
+        batch.set(link_data_cls.aim_secondary_locator, "visibility", False)
 
-        cmds.matchTransform(link_data_cls.aim_primary_locator, link_data_cls.driver_joint)
-        cmds.xform(link_data_cls.aim_secondary_locator, r=True, os=True, t=(1,0,0))
-      
-        cmds.matchTransform(link_data_cls.aim_secondary_locator, link_data_cls.driver_joint)
-        cmds.xform(link_data_cls.aim_secondary_locator, r=True, os=True, t=(0,1,0))
+        batch.connect(root_locator, "worldMatrix[0]", link_data_cls.aim_primary_locator, "offsetParentMatrix")
+        batch.connect(root_locator, "worldMatrix[0]", link_data_cls.aim_secondary_locator, "offsetParentMatrix")
+        batch.connect(root_locator, "worldMatrix[0]", link_data_cls.guide_locator, "offsetParentMatrix")
         link_data.append(link_data_cls)
 
+    batch.apply()
+
+    root_matrix = module_guides.get_guide_matrix(guide_matrices, link_names[0], "FK_root")
+    if root_matrix:
+        stored_matrices[root_locator.name] = root_matrix
+    else:
+        cmds.matchTransform(root_locator.name, link_data[0].driver_joint.name, position=True)
+
+    for current in link_data:
+        primary_matrix = module_guides.get_guide_matrix(guide_matrices, current.link_name, "FK_primaryAim")
+        secondary_matrix = module_guides.get_guide_matrix(guide_matrices, current.link_name, "FK_secondaryAim")
+        if primary_matrix and secondary_matrix:
+            stored_matrices[current.aim_primary_locator.name] = primary_matrix
+            stored_matrices[current.aim_secondary_locator.name] = secondary_matrix
+        else:
+            cmds.matchTransform(current.aim_primary_locator.name, current.driver_joint.name)
+            cmds.xform(current.aim_secondary_locator.name, r=True, os=True, t=(1,0,0))
+          
+            cmds.matchTransform(current.aim_secondary_locator.name, current.driver_joint.name)
+            cmds.xform(current.aim_secondary_locator.name, r=True, os=True, t=(0,1,0))
+
+        guide_matrix = module_guides.get_guide_matrix(guide_matrices, current.link_name, "FK_guide")
+        if guide_matrix:
+            stored_matrices[current.guide_locator.name] = guide_matrix
+        else:
+            cmds.matchTransform(current.guide_locator.name, current.driver_joint.name)
+
     for last, current, next in zip([None] + link_data[:-1], link_data, link_data[1:] + [None]):
-        cmds.connectAttr(f"{root_locator}.worldMatrix[0]", f"{current.guide_locator}.offsetParentMatrix")
-        cmds.matchTransform(current.guide_locator, current.driver_joint)
-        cmds.connectAttr(
-            f"{current.guide_locator}.worldMatrix[0]",
-            f"{current.aim_matrix}.inputMatrix"
-        )
-
-        cmds.setAttr(f"{current.aim_matrix}.primaryInputAxisX", aim_direction)
-        cmds.setAttr(f"{current.aim_matrix}.secondaryInputAxisY", 1)
-        cmds.setAttr(f"{current.aim_matrix}.secondaryMode", 1)
-
-        cmds.connectAttr(
-            f"{current.aim_matrix}.outputMatrix",
-            f"{current.aim_inverse_matrix}.inputMatrix"
-        )
-
-        cmds.connectAttr(
-            f"{current.aim_primary_locator}.worldMatrix[0]",
-            f"{current.aim_matrix}.primaryTargetMatrix"
-        )
-
-        cmds.connectAttr(
-            f"{current.aim_secondary_locator}.worldMatrix[0]",
-            f"{current.aim_matrix}.secondaryTargetMatrix"
-        )
-
-        cmds.connectAttr(
-            f"{current.aim_matrix}.outputMatrix",
-            f"{current.FK_control}.offsetParentMatrix",
-            f=True
-        )
+        batch.connect(current.guide_locator, "worldMatrix[0]", current.aim_matrix, "inputMatrix")
+
+        batch.set(current.aim_matrix, "primaryInputAxisX", float(aim_direction))
+        batch.set(current.aim_matrix, "secondaryInputAxisY", 1.0)
+        batch.set(current.aim_matrix, "secondaryMode", 1)
+
+        batch.connect(current.aim_matrix, "outputMatrix", current.aim_inverse_matrix, "inputMatrix")
+
+        batch.connect(current.aim_primary_locator, "worldMatrix[0]", current.aim_matrix, "primaryTargetMatrix")
+
+        batch.connect(current.aim_secondary_locator, "worldMatrix[0]", current.aim_matrix, "secondaryTargetMatrix")
 
         if last:
-            cmds.connectAttr(f"{last.aim_inverse_matrix}.outputMatrix", f"{current.parent_offset_mult_matrix}.matrixIn[1]")
-            cmds.connectAttr(f"{last.FK_control}.worldMatrix[0]", f"{current.world_mult_matrix}.matrixIn[1]")
+            batch.connect(last.aim_inverse_matrix, "outputMatrix", current.parent_offset_mult_matrix, "matrixIn[1]")
+            batch.connect(last.FK_control, "worldMatrix[0]", current.world_mult_matrix, "matrixIn[1]")
 
-        cmds.connectAttr(f"{current.aim_matrix}.outputMatrix", f"{current.parent_offset_mult_matrix}.matrixIn[0]")
+        batch.connect(current.aim_matrix, "outputMatrix", current.parent_offset_mult_matrix, "matrixIn[0]")
 
-        cmds.connectAttr(f"{current.parent_offset_mult_matrix}.matrixSum", f"{current.world_mult_matrix}.matrixIn[0]")
+        batch.connect(current.parent_offset_mult_matrix, "matrixSum", current.world_mult_matrix, "matrixIn[0]")
         
-        cmds.connectAttr(f"{current.world_mult_matrix}.matrixSum", f"{current.FK_control}.offsetParentMatrix",f=True)
+        batch.connect(current.world_mult_matrix, "matrixSum", current.FK_control, "offsetParentMatrix", force=True)
+
+    batch.apply()
+
+    module_guides.apply_local_matrices(stored_matrices)
 
     if not keep_end_control:
         end_control_data = link_data[-1]
 
         link_data.pop(-1)
 
-        cmds.delete(end_control_data.FK_control)
-        cmds.delete(end_control_data.FK_joint)
-        cmds.delete(end_control_data.guide_locator)
-        cmds.delete(end_control_data.aim_primary_locator)
-        cmds.delete(end_control_data.aim_secondary_locator)
+        cmds.delete(end_control_data.FK_control.name,
+                    end_control_data.FK_joint.name,
+                    end_control_data.guide_locator.name,
+                    end_control_data.aim_primary_locator.name,
+                    end_control_data.aim_secondary_locator.name)
 
     return root_locator,link_data
 
-def parent_FK_nodes(root_locator,link_data):      
+#Nodes are registered with the module's parenting queue and reparented when the module flushes it.
+
+def parent_FK_nodes(root_locator,link_data,parenting_queue):
+    parenting_queue.register('guide_group', [root_locator])
     for data in link_data:
-        guide_node = module_query.find_single_node(attrs = {'featureType': 'guide_group',
-                                        'moduleParent': data.module_name})
-        cmds.parent(data.guide_locator,data.aim_primary_locator,data.aim_secondary_locator,root_locator,guide_node)
-        
-        joint_node = module_query.find_single_node(attrs = {'featureType': 'joint_group',
-                                        'moduleParent': data.module_name})
-        cmds.parent(data.FK_joint,joint_node)
+        parenting_queue.register('guide_group', [data.guide_locator,data.aim_primary_locator,data.aim_secondary_locator])
+        parenting_queue.register('joint_group', [data.FK_joint])
+        parenting_queue.register('control_group', [data.FK_control])
+
+#Proxy chains are for layout and blocking. Each joint only gets an FK control and an FK joint driven directly by it.
+#Controls are parented in a chain and zeroed through a static offsetParentMatrix, so there are no guides, aim locators
+#or matrix nodes. Proxy nodes are tagged with buildMode so the chain can be upgraded to a full FK chain later.
+
+@dataclass
+class FKProxyLinkData:
+    module_name: str
+    link_name: str
+    FK_control: NodeHandle
+    driver_joint: NodeHandle
+    FK_joint: NodeHandle
+
+#Controls are parented into their chain straight away, their offsets are computed from it. FK joints go through the
+#parenting queue like in a full chain.
+
+def create_FK_proxy_chain(link_names: list[str], module_name: str, parenting_queue) -> list[FKProxyLinkData]:
+    control_node = module_query.find_single_node(attrs = {'featureType': 'control_group',
+                                    'moduleParent': module_name})
+    
+    batch = ConnectionBatch()
+    parent_node = control_node
+    parent_matrix = om.MMatrix(cmds.xform(control_node, query=True, worldSpace=True, matrix=True))
+
+    link_data = []
+    for link in link_names:
+        driver_joint = module_query.find_single_node({"jointID": link,
+                                                      "featureType": 'driver_joint'})
+        if not driver_joint:
+            cmds.error(f"No driver joint ID in scene matches {link}.")
+
+        FK_control = create_node.create_placeholder_curve(f"{link}_FK_ctrl", {'moduleParent': module_name,
+                                              'featureType':"FK_control",
+                                              'controlID': link,
+                                              'buildMode': "proxy"})
         
-        control_node = module_query.find_single_node(attrs = {'featureType': 'control_group',
-                                        'moduleParent': data.module_name})
-        cmds.parent(data.FK_control,control_node)
\ No newline at end of file
+        FK_joint = create_node.create_module_node('joint', f"{link}_FK_joint", {'moduleParent': module_name,
+                                              'featureType':"FK_joint",
+                                              'jointID': link,
+                                              'buildMode': "proxy"})
+
+        data = FKProxyLinkData(module_name = module_name,
+                               link_name = link,
+                               FK_control = NodeHandle(FK_control),
+                               driver_joint = NodeHandle(driver_joint),
+                               FK_joint = NodeHandle(FK_joint))
+
+        cmds.parent(data.FK_control.name, parent_node, relative=True)
+        parenting_queue.register('joint_group', [data.FK_joint])
+
+        rest_matrix = om.MMatrix(cmds.xform(driver_joint, query=True, worldSpace=True, matrix=True))
+        batch.set(data.FK_control, "offsetParentMatrix", rest_matrix * parent_matrix.inverse())
+        batch.connect(data.FK_control, "worldMatrix[0]", data.FK_joint, "offsetParentMatrix")
+
+        batch.hide(data.FK_control)
+        batch.set(data.FK_joint, "visibility", False)
+        batch.hide(data.FK_joint)
+        batch.set(data.driver_joint, "visibility", False)
+
+        parent_node = data.FK_control.name
+        parent_matrix = rest_matrix
+        link_data.append(data)
+
+    cmds.select(clear=True)
+    batch.apply()
+
+    return link_data
+
+#Before a proxy chain is upgraded, its controls are flattened back under the control group with their animated local
+#values untouched and their static offset cleared. The full chain then drives them through its aim network. Proxy FK
+#joints are replaced by the full build.
+
+def prepare_FK_proxy_upgrade(module_name: str) -> dict[str, NodeHandle]:
+    proxy_nodes = [NodeHandle(node) for node in module_query.find_multiple_nodes({"moduleParent": module_name,
+                                                                                  "buildMode": "proxy"})]
+    if not proxy_nodes:
+        return {}
+
+    control_node = module_query.find_single_node(attrs = {'featureType': 'control_group',
+                                    'moduleParent': module_name})
+
+    controls = {}
+    joints = []
+    for node in proxy_nodes:
+        feature_type = module_query.find_rig_attribute(node_name=node.name, attr="featureType")
+        if feature_type == "FK_control":
+            controls[module_query.find_rig_attribute(node_name=node.name, attr="controlID")] = node
+        elif feature_type == "FK_joint":
+            joints.append(node.name)
+
+    if joints:
+        cmds.delete(joints)
+
+    #The root control is already under the control group, parenting it again would only raise a warning.
+    control_group = NodeHandle(control_node)
+    batch = ConnectionBatch()
+    for control in controls.values():
+        if om.MFnDagNode(control.mobject).parent(0) != control_group.mobject:
+            cmds.parent(control.name, control_node, relative=True)
+        cmds.deleteAttr(f"{control.name}.buildMode")
+        batch.set(control, "offsetParentMatrix", om.MMatrix())
+    batch.apply()
+
+    return controls
+
+#Reads everything the FK evaluator (FK_eval) needs from a built chain as plain lists, so a network can be written to
+#JSON and evaluated without Maya. The current control and FK joint matrices are captured too, as one pose the
+#evaluator has to reproduce. Links without a control, ex. a removed end control, are left out.
+
+def capture_FK_network(module_name: str, link_names: list[str]) -> dict:
+    index = tag_index.build_tag_index()
+
+    def get_link_nodes(feature_type: str, key_tag: str = "jointID", attrs: dict|None = None) -> dict[str, str]:
+        return {index[node][key_tag]: node
+                for node in tag_index.filter_tag_index(index, {"featureType": feature_type, **(attrs or {})})
+                if index[node].get(key_tag)}
+
+    module_attrs = {"moduleParent": module_name}
+    guides = get_link_nodes("FK_guide", attrs=module_attrs)
+    primary_locators = get_link_nodes("FK_primaryAim", attrs=module_attrs)
+    secondary_locators = get_link_nodes("FK_secondaryAim", attrs=module_attrs)
+    controls = get_link_nodes("FK_control", "controlID", module_attrs)
+    FK_joints = get_link_nodes("FK_joint", attrs=module_attrs)
+    bind_joints = get_link_nodes("bind_joint")
+
+    control_group = module_query.find_single_node(attrs = {'featureType': 'control_group',
+                                    'moduleParent': module_name})
+    joint_group = module_query.find_single_node(attrs = {'featureType': 'joint_group',
+                                    'moduleParent': module_name})
+
+    data = {"module_name": module_name,
+            "link_names": [],
+            "guide_matrices": [],
+            "primary_matrices": [],
+            "secondary_matrices": [],
+            "primary_axis": [],
+            "secondary_axis": [],
+            "control_matrices": [],
+            "joint_matrices": [],
+            "bind_matrices": [],
+            "control_parent": cmds.getAttr(f"{control_group}.worldMatrix[0]"),
+            "joint_parent": cmds.getAttr(f"{joint_group}.worldMatrix[0]")}
+
+    for link in link_names:
+        if link not in controls:
+            continue
+        aim_matrix = cmds.listConnections(f"{guides[link]}.worldMatrix[0]", type="aimMatrix",
+                                          source=False, destination=True)[0]
+
+        data["link_names"].append(link)
+        data["guide_matrices"].append(cmds.getAttr(f"{guides[link]}.worldMatrix[0]"))
+        data["primary_matrices"].append(cmds.getAttr(f"{primary_locators[link]}.worldMatrix[0]"))
+        data["secondary_matrices"].append(cmds.getAttr(f"{secondary_locators[link]}.worldMatrix[0]"))
+        data["primary_axis"].append(list(cmds.getAttr(f"{aim_matrix}.primaryInputAxis")[0]))
+        data["secondary_axis"].append(list(cmds.getAttr(f"{aim_matrix}.secondaryInputAxis")[0]))
+        data["control_matrices"].append(cmds.getAttr(f"{controls[link]}.matrix"))
+        data["joint_matrices"].append(cmds.getAttr(f"{FK_joints[link]}.worldMatrix[0]"))
+        data["bind_matrices"].append(cmds.getAttr(f"{bind_joints[link]}.worldMatrix[0]"))
+
+    return data
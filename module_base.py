@@ -4,13 +4,20 @@ from typing import List, Dict
 from abc import ABC, abstractmethod
 
 import autorig.control_rig.module.error as module_error
+import autorig.control_rig.module.query as module_query
 import autorig.control_rig.module.setup as module_setup
+import autorig.control_rig.module.teardown as module_teardown
+import autorig.control_rig.module.connections as module_connections
+import autorig.control_rig.module.parenting as module_parenting
 import autorig.control_rig.feature.base as feature_base
 
 from autorig.control_rig.module.registry import MODULE_REGISTRY
 
 class ModuleBase(ABC):
     cls_module_name = ""
+
+    #Modules the module builds its nodes with, hashed into the build cache key. Subclasses extend it.
+    source_modules = (module_setup,)
     
     @property
     def instance_module_name(self) -> str:
@@ -53,6 +60,10 @@ class ModuleBase(ABC):
 
     def __init__ (self, side="", *args, **kwargs):
         self.side = side
+        self.stored_guides = {}
+        self.proxy = False
+        self.pending_parents = module_parenting.ParentingQueue(self.instance_module_name)
+        self.defer_parenting = False
         self.initialized_features = {}
         self.initialized_multi_features = {}
         self.initialize_features()
@@ -78,7 +89,7 @@ class ModuleBase(ABC):
         return cls(side=side)
     
     @abstractmethod
-    def add_feature(self, feature):
+    def add_feature(self, feature, proxy=None):
         raise NotImplementedError("ABSTRACT METHOD: add_feature must contain logic for adding module features")
     
     @abstractmethod
@@ -102,14 +113,18 @@ class ModuleBase(ABC):
         is_valid = module_setup.get_bind_joints(self.instance_module_name)   
         return is_valid
     
-    def create_module(self):
+    #Proxy modules are built for layout and blocking. Features added to them default to their proxy build when they
+    #have one, and the module root stays so proxy modules can still be connected.
+    def create_module(self, proxy=False) -> bool:
         is_valid = self.validate_bind_joints()
         if not is_valid:
-            return
+            return False
 
+        self.proxy = proxy
         self.create_module_group_nodes()
         self.create_driver_joints()
         self.create_module_root_guide()
+        return True
           
     def create_driver_joints(self):
         module_setup.create_driver_joints(self)
@@ -120,11 +135,18 @@ class ModuleBase(ABC):
     def create_module_group_nodes(self):
         module_setup.create_module_group_nodes(self.instance_module_name)    
 
-    def add_feature(self,feature):
+    def add_feature(self,feature,proxy=None):
+        if proxy is None:
+            proxy = self.proxy
+
         instance_feature = self.initialized_features.get(feature)
         if instance_feature:
             ID_list = self.supported_features[type(instance_feature)]
-            instance_feature.create(self,ID_list)
+            if proxy and hasattr(instance_feature, "create_proxy"):
+                instance_feature.create_proxy(self,ID_list)
+            else:
+                instance_feature.create(self,ID_list)
+            self.flush_parenting()
             self.add_module_attr(feature, "moduleFeatures")
             instance_feature.attach(self)
         elif self.initialized_multi_features.get(feature):
@@ -134,12 +156,40 @@ class ModuleBase(ABC):
         else:
             module_error.send_warning(f"Feature {feature} not supported by {self.cls_module_name} class.")
 
+    #Features that declare their featureTypes are torn down by tag in one batched delete.
     def remove_feature(self,feature):
         instance_feature = self.initialized_features.get(feature)
         if instance_feature:
-            self.supported_features[type(instance_feature)]
-            
-            instance_feature.remove()
+            if getattr(instance_feature, "feature_node_types", None):
+                module_teardown.remove_features([self], [feature])
+            else:
+                instance_feature.remove()
         else:
             module_error.send_warning(f"Feature not supported by {self.cls_module_name} class.")
+
+    #Upgrades every proxy feature on the module to its full build in place.
+    def upgrade_proxy(self):
+        module_features = module_query.find_rig_attribute(node_name=self.instance_module_name, attr="moduleFeatures")
+        for feature in module_teardown.split_attr(module_features):
+            instance_feature = self.initialized_features.get(feature)
+            if instance_feature and hasattr(instance_feature, "upgrade"):
+                instance_feature.upgrade(self, self.supported_features[type(instance_feature)])
+        self.proxy = False
+        self.flush_parenting()
+
+    #Features register their nodes with pending_parents. Builds that add several features to a module set
+    #defer_parenting and flush once when the module is finished.
+    def flush_parenting(self, force=False):
+        if force or not self.defer_parenting:
+            self.pending_parents.flush()
+
+    def remove_module(self):
+        module_teardown.remove_modules([self.instance_module_name])
+
+    #Single connections go through the same batched rewiring as full edge sets.
+    def add_module_connection(self, input_instance, output_instance):
+        module_connections.rewire_modules({output_instance.instance_module_name: input_instance.instance_module_name})
+
+    def remove_module_connection(self, input_instance, output_instance):
+        module_connections.rewire_modules({output_instance.instance_module_name: None})
    
\ No newline at end of file
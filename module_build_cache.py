@@ -0,0 +1,111 @@
+#A module built with the same features against the same skeleton always produces the same node network. Built modules
+#are exported to a cache keyed by a hash of everything that decides their output, and on a hit the whole module is
+#imported in one file import instead of running the feature code again.
+
+import hashlib
+import inspect
+import json
+import os
+import maya.cmds as cmds
+
+import autorig.control_rig.module.guides as module_guides
+import autorig.control_rig.module.mirror as module_mirror
+
+#Bump to throw away every cached module, for changes the feature source hashes can't see.
+CACHE_VERSION = 1
+
+CACHE_DIR_ENV = "AUTORIG_BUILD_CACHE"
+
+SOURCE_HASHES = {}
+
+def get_cache_dir() -> str:
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(os.path.expanduser("~"), ".autorig", "build_cache")
+
+def get_cache_path(cache_key: str) -> str:
+    return os.path.join(get_cache_dir(), f"{cache_key}.ma")
+
+#Module and feature source files are part of the key, along with the helper modules each class lists in
+#source_modules, ex. the FK feature's FK_utils. Editing any of those never returns a stale module. Code a class
+#builds with but doesn't list is not covered, changes to it need CACHE_VERSION bumped.
+
+def get_file_hash(source_file: str) -> str:
+    if source_file not in SOURCE_HASHES:
+        with open(source_file, "rb") as f:
+            SOURCE_HASHES[source_file] = hashlib.sha1(f.read()).hexdigest()
+    return SOURCE_HASHES[source_file]
+
+def get_source_hash(cls) -> str:
+    source_files = [inspect.getsourcefile(cls)]
+    source_files += [inspect.getsourcefile(module) for module in getattr(cls, "source_modules", ())]
+
+    source_hash = hashlib.sha1()
+    for source_file in dict.fromkeys(source_files):
+        source_hash.update(get_file_hash(source_file).encode())
+    return source_hash.hexdigest()
+
+#Multi-module features connect to nodes outside the module, so modules using them are never cached.
+
+def is_cacheable(module_instance, features: list[str]) -> bool:
+    return not any(feature in module_instance.initialized_multi_features for feature in features)
+
+def get_cache_key(module_instance, features: list[str]) -> str:
+    feature_data = {}
+    for feature in features:
+        instance_feature = module_instance.initialized_features.get(feature)
+        if not instance_feature:
+            continue
+        feature_data[feature] = {"ID_list": module_instance.supported_features[type(instance_feature)],
+                                 "source": get_source_hash(type(instance_feature))}
+
+    key_data = {
+        "version": CACHE_VERSION,
+        "module_class": f"{type(module_instance).__module__}.{type(module_instance).__name__}",
+        "module_source": get_source_hash(type(module_instance)),
+        "module_name": module_instance.instance_module_name,
+        "features": feature_data,
+        "joint_IDs": module_instance.ID_list,
+        "skeleton": module_guides.skeleton_fingerprint(module_instance.ID_list),
+        "guides": module_instance.stored_guides,
+        "proxy": module_instance.proxy,
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode()).hexdigest()
+
+def has_cached_module(cache_key: str) -> bool:
+    return os.path.exists(get_cache_path(cache_key))
+
+def store_module(module_name: str, cache_key: str) -> str|None:
+    nodes = module_mirror.get_module_nodes(module_name)
+    if not nodes:
+        return None
+
+    cache_path = get_cache_path(cache_key)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    #Exported to a temporary file first so a failed export never leaves a broken cache entry behind.
+    temp_path = f"{cache_path[:-3]}.{os.getpid()}.tmp.ma"
+    selection = cmds.ls(selection=True)
+    cmds.select(nodes, replace=True, noExpand=True)
+    try:
+        cmds.file(temp_path, exportSelected=True, type="mayaAscii", force=True,
+                  constructionHistory=False, channels=False, constraints=False,
+                  expressions=False, shader=False, preserveReferences=False)
+    finally:
+        if selection:
+            cmds.select(selection, replace=True)
+        else:
+            cmds.select(clear=True)
+
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+def load_module(cache_key: str) -> list[str]:
+    return cmds.file(get_cache_path(cache_key), i=True, type="mayaAscii", namespace=":",
+                     ignoreVersion=True, preserveReferences=False, returnNewNodes=True) or []
+
+def clear_cache():
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith(".ma"):
+            os.remove(os.path.join(cache_dir, file_name))
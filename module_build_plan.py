@@ -0,0 +1,161 @@
+#Template builds are broken down into module and feature steps. Planning and validation only read the template data,
+#the module registry and a list of modules already in the scene taken on the main thread, so they are safe to run off
+#the main thread. Steps are run through the same function whether the whole template is built at once or in chunks by
+#the build runner.
+
+import maya.cmds as cmds
+from dataclasses import dataclass, field
+
+import autorig.control_rig.module.query as module_query
+import autorig.control_rig.module.tag_index as tag_index
+import autorig.control_rig.module.mirror as module_mirror
+import autorig.control_rig.module.build_cache as build_cache
+import autorig.control_rig.module.teardown as module_teardown
+import autorig.control_rig.module.connections as module_connections
+import autorig.control_rig.module.build_steps as build_steps
+
+from autorig.control_rig.module.build_steps import BuildStep, get_template_modules
+
+#Module instances are kept for the whole build so every step of a module works on the same instance. Modules that
+#were imported from the build cache skip their feature steps. Proxy builds create every module in proxy mode.
+
+@dataclass
+class BuildContext:
+    module_instances: dict = field(default_factory=dict)
+    created_modules: list = field(default_factory=list)
+    use_cache: bool = True
+    proxy: bool = False
+    cache_keys: dict = field(default_factory=dict)
+    cached_modules: set = field(default_factory=set)
+
+    def get_instance(self, module_name: str):
+        instance = self.module_instances.get(module_name)
+        if not instance:
+            module_cls = module_query.find_cls_module(module_name)
+            instance = module_cls.create_from_name(module_name)
+            self.module_instances[module_name] = instance
+        return instance
+
+#Reads the scene, so it has to be called on the main thread.
+
+def get_scene_modules() -> set[str]:
+    return set(module_teardown.get_module_groups(tag_index.build_tag_index()))
+
+#Modules that already exist in the scene are rejected. A build only ever rolls back modules it created itself, so it
+#must never build over one the user made before loading the template. Inputs have to be in the template or the scene.
+
+def validate_template_build(data: dict, template_name: str = "human", scene_modules: set[str]|None = None) -> list[str]:
+    errors = []
+
+    if template_name not in data or "modules" not in data[template_name]:
+        return [f"Template has no '{template_name}' modules."]
+
+    modules = get_template_modules(data, template_name)
+    for module, module_data in modules.items():
+        if scene_modules and module in scene_modules:
+            errors.append(f"Module {module} already exists in scene.")
+            continue
+
+        module_cls = module_query.find_cls_module(module)
+        if not module_cls:
+            errors.append(f"No registered module class matches {module}.")
+            continue
+
+        module_instance = module_cls.create_from_name(module)
+        supported = list(module_instance.initialized_features) + list(module_instance.initialized_multi_features)
+        for feature in module_data.get("features", []):
+            if feature not in supported:
+                errors.append(f"Feature {feature} not supported by {module}.")
+
+        for input in module_data.get("inputs", []):
+            if input not in modules and input not in (scene_modules or ()):
+                errors.append(f"Input {input} of {module} is not in the template or the scene.")
+
+    return errors
+
+#Multi-module features are looked up from the registered module classes, the step order itself is planned by
+#build_steps.
+
+def get_multi_features(modules: dict) -> dict[str, set[str]]:
+    return {module: set(module_query.find_cls_module(module).create_from_name(module).initialized_multi_features)
+            for module in modules}
+
+def plan_template_build(data: dict, template_name: str = "human", mirror: bool = False,
+                        mirror_plane: str = "YZ", mirror_from: str = "L") -> list[BuildStep]:
+    modules = get_template_modules(data, template_name)
+    return build_steps.plan_steps(modules, get_multi_features(modules), template_name,
+                                  mirror=mirror, mirror_plane=mirror_plane, mirror_from=mirror_from)
+
+#On a cache hit the whole module is imported and its feature steps are skipped. On a miss the key is kept so the
+#finished module can be stored when it is finalized.
+#
+#Validation rejects modules that already exist, so a module is recorded as created before anything is built for it.
+#A create, mirror or cache import that fails partway is then still rolled back.
+
+def load_cached_module(step: BuildStep, module_instance, context: BuildContext) -> bool:
+    if not context.use_cache or step.features is None:
+        return False
+    if not build_cache.is_cacheable(module_instance, step.features) or not module_instance.validate_bind_joints():
+        return False
+
+    cache_key = build_cache.get_cache_key(module_instance, step.features)
+    context.cache_keys[step.module_name] = cache_key
+    if not build_cache.has_cached_module(cache_key):
+        return False
+
+    context.created_modules.append(step.module_name)
+    build_cache.load_module(cache_key)
+    context.cached_modules.add(step.module_name)
+    return True
+
+def run_step(step: BuildStep, context: BuildContext):
+    #Every module in a template build is new, so every edge has to change. Edges rewire_modules skipped would
+    #otherwise only be warnings and the build would finish with modules left unconnected.
+    if step.kind == "connect":
+        changed = module_connections.rewire_modules(step.edges)
+        missing = [f"{input_module} -> {module}" for module, input_module in step.edges.items() if module not in changed]
+        if missing:
+            cmds.error(f"Modules could not be connected: {', '.join(missing)}.")
+        return
+
+    module_instance = context.get_instance(step.module_name)
+
+    if step.kind == "create":
+        if step.guides:
+            module_instance.stored_guides = step.guides
+        module_instance.proxy = context.proxy
+        module_instance.defer_parenting = True
+        if load_cached_module(step, module_instance, context):
+            return
+        context.created_modules.append(step.module_name)
+        if not module_instance.create_module(proxy=context.proxy):
+            cmds.error(f"Module {step.module_name} could not be created, its bind joints are not valid.")
+    elif step.kind == "feature":
+        if step.module_name in context.cached_modules:
+            return
+        module_instance.add_feature(step.feature)
+    elif step.kind == "finalize":
+        module_instance.flush_parenting(force=True)
+        module_instance.defer_parenting = False
+        cache_key = context.cache_keys.get(step.module_name)
+        if cache_key and step.module_name not in context.cached_modules:
+            build_cache.store_module(step.module_name, cache_key)
+    elif step.kind == "mirror":
+        context.created_modules.append(step.module_name)
+        if not module_mirror.mirror_module(step.source_module, step.module_name, plane=step.mirror_plane):
+            cmds.error(f"Module {step.module_name} could not be mirrored from {step.source_module}.")
+    else:
+        cmds.error(f"Unknown build step '{step.kind}' for {step.module_name}.")
+
+def run_plan(steps: list[BuildStep], context: BuildContext|None = None) -> BuildContext:
+    context = context or BuildContext()
+    for step in steps:
+        run_step(step, context)
+    return context
+
+#Rolling back removes every module this build created in one teardown pass, including their names in the
+#connection attributes of modules that already existed.
+
+def rollback_build(context: BuildContext):
+    module_teardown.remove_modules(list(reversed(context.created_modules)))
+    context.created_modules.clear()
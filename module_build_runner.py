@@ -0,0 +1,110 @@
+#Runs template builds in chunks on Maya's idle queue so the Module Builder stays responsive while a rig is built.
+#Validation and planning happen on a worker thread since they never touch the scene. Progress is streamed back
+#through Qt signals, and a cancelled or failed build rolls back the modules it had started.
+
+import threading
+import time
+
+import maya.utils
+
+from PySide2.QtCore import QObject, Signal
+
+import autorig.control_rig.module.build_plan as build_plan
+import autorig.control_rig.module.error as module_error
+
+class BuildRunner(QObject):
+    progress = Signal(int, int, str)
+    finished = Signal(bool)
+
+    def __init__(self, data: dict, template_name: str = "human", chunk_time: float = 0.05,
+                 mirror: bool = False, mirror_plane: str = "YZ", use_cache: bool = True,
+                 proxy: bool = False, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.template_name = template_name
+        self.mirror = mirror
+        self.mirror_plane = mirror_plane
+        self.chunk_time = chunk_time
+        self.steps = []
+        self.step_index = 0
+        self.scene_modules = set()
+        self.context = build_plan.BuildContext(use_cache=use_cache, proxy=proxy)
+        self.cancelled = False
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.cancelled = False
+        self.scene_modules = build_plan.get_scene_modules()
+        threading.Thread(target=self.plan_build, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled = True
+
+    #Worker thread. Results are handed back to the main thread through the idle queue.
+
+    def plan_build(self):
+        try:
+            errors = build_plan.validate_template_build(self.data, self.template_name, self.scene_modules)
+            steps = [] if errors else build_plan.plan_template_build(self.data, self.template_name,
+                                                                     mirror=self.mirror,
+                                                                     mirror_plane=self.mirror_plane)
+        except Exception as e:
+            errors, steps = [f"Failed to plan template build: {e}"], []
+
+        maya.utils.executeDeferred(self.begin_build, steps, errors)
+
+    def begin_build(self, steps, errors):
+        if errors:
+            for error in errors:
+                module_error.send_warning(error)
+            self.finish_build(False)
+            return
+
+        self.steps = steps
+        self.step_index = 0
+        self.progress.emit(0, len(self.steps), "Starting build")
+        maya.utils.executeDeferred(self.run_chunk)
+
+    #A failed rollback is reported, but the build still finishes so later builds aren't blocked.
+
+    def rollback(self):
+        try:
+            build_plan.rollback_build(self.context)
+        except Exception as e:
+            module_error.send_warning(f"Failed to roll back template build: {e}")
+        self.finish_build(False)
+
+    #Each chunk runs at least one step, then keeps going until it has used up its time slice.
+
+    def run_chunk(self):
+        if self.cancelled:
+            self.rollback()
+            return
+
+        chunk_start = time.perf_counter()
+        while self.step_index < len(self.steps):
+            step = self.steps[self.step_index]
+            try:
+                build_plan.run_step(step, self.context)
+            except Exception as e:
+                module_error.send_warning(f"Build failed at '{step.label}': {e}")
+                self.rollback()
+                return
+
+            self.step_index += 1
+            self.progress.emit(self.step_index, len(self.steps), step.label)
+
+            if time.perf_counter() - chunk_start > self.chunk_time:
+                break
+
+        if self.step_index >= len(self.steps):
+            self.finish_build(True)
+        else:
+            maya.utils.executeDeferred(self.run_chunk)
+
+    def finish_build(self, success: bool):
+        self.running = False
+        self.finished.emit(success)
@@ -0,0 +1,98 @@
+#The order of a template build only depends on the template data and on which features connect to other modules, so
+#planning is kept free of Maya and the module registry. The build plan fills in the multi-module features from the
+#registry, and the build workers' stand-in backend can plan the same steps without Maya.
+
+from dataclasses import dataclass
+
+MIRROR_SIDES = {"L": "R", "R": "L"}
+
+@dataclass
+class BuildStep:
+    kind: str
+    module_name: str
+    feature: str|None = None
+    source_module: str|None = None
+    mirror_plane: str = "YZ"
+    guides: dict|None = None
+    features: list[str]|None = None
+    edges: dict|None = None
+
+    @property
+    def label(self) -> str:
+        if self.kind == "create":
+            return f"Creating {self.module_name}"
+        if self.kind == "feature":
+            return f"Adding {self.feature} to {self.module_name}"
+        if self.kind == "connect":
+            return f"Connecting {len(self.edges or {})} modules"
+        if self.kind == "mirror":
+            return f"Mirroring {self.source_module} to {self.module_name}"
+        if self.kind == "finalize":
+            return f"Finishing {self.module_name}"
+        return f"{self.kind} {self.module_name}"
+
+def get_side(module_name: str) -> str:
+    return module_name.rsplit("_", 1)[-1] if "_" in module_name else ""
+
+def get_template_modules(data: dict, template_name: str = "human") -> dict:
+    return data[template_name]["modules"]
+
+#A module is mirrored when its opposite side is in the template with the same features. Modules with multi-module
+#features are always built, since those features connect to nodes outside the module. multi_features maps each module
+#to the names of its multi-module features.
+
+def get_mirror_source(module: str, modules: dict, multi_features: dict[str, set[str]],
+                      source_side: str = "L") -> str|None:
+    if get_side(module) != MIRROR_SIDES.get(source_side):
+        return None
+
+    source = f"{module.rsplit('_', 1)[0]}_{source_side}"
+    features = modules[module].get("features", [])
+    if source not in modules or modules[source].get("features", []) != features:
+        return None
+
+    if any(feature in multi_features.get(module, ()) for feature in features):
+        return None
+    return source
+
+#All modules are created before any features are added so multi-module features can find the other modules.
+#Each built module is finalized once its own features are done. Mirrored modules are copied once their source side
+#is finished, and multi-module features wait until every module exists. Connections are made last.
+
+def plan_steps(modules: dict, multi_features: dict[str, set[str]], template_name: str = "human",
+               mirror: bool = False, mirror_plane: str = "YZ", mirror_from: str = "L") -> list[BuildStep]:
+    mirror_sources = {}
+    if mirror:
+        for module in modules:
+            source = get_mirror_source(module, modules, multi_features, mirror_from)
+            if source:
+                mirror_sources[module] = source
+
+    steps = [BuildStep("create", module, guides=module_data.get("guides"), features=module_data.get("features", []))
+             for module, module_data in modules.items() if module not in mirror_sources]
+
+    multi_feature_steps = []
+    for module, module_data in modules.items():
+        if module in mirror_sources:
+            continue
+
+        for feature in module_data.get("features", []):
+            step = BuildStep("feature", module, feature=feature)
+            if feature in multi_features.get(module, ()):
+                multi_feature_steps.append(step)
+            else:
+                steps.append(step)
+
+    steps += [BuildStep("finalize", module) for module in modules if module not in mirror_sources]
+
+    for module, source in mirror_sources.items():
+        steps.append(BuildStep("mirror", module, source_module=source, mirror_plane=mirror_plane))
+
+    steps += multi_feature_steps
+
+    #Modules take a single input, so every template connection is rewired together as one set of edges.
+    edges = {module: module_data["inputs"][0] for module, module_data in modules.items() if module_data.get("inputs")}
+    if edges:
+        steps.append(BuildStep("connect", template_name, edges=edges))
+
+    return steps
@@ -0,0 +1,356 @@
+#Batch rig rebuilds spend most of their time starting a headless interpreter and importing the autorig package. Build
+#workers are started once, preload the module registry and feature modules, then keep pulling template jobs from a
+#local file queue until they are told to stop. Jobs are claimed by moving them between queue folders, so any number of
+#workers can share one queue.
+#
+#Maya is only imported by the Maya backend. The stand-in backend runs the real template planning against a fake scene,
+#which lets the queue and pool be run without Maya.
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+
+PENDING_FOLDER = "pending"
+RUNNING_FOLDER = "running"
+RESULTS_FOLDER = "results"
+STOP_FILE = "stop"
+CLAIM_SEPARATOR = "__"
+
+@dataclass
+class BuildJob:
+    job_id: str
+    template_path: str
+    scene_path: str = ""
+    output_path: str = ""
+    mirror: bool = False
+    submitted: float = 0.0
+
+@dataclass
+class BuildResult:
+    job_id: str
+    success: bool
+    worker: int
+    error: str = ""
+    timings: dict = field(default_factory=dict)
+
+class MayaSceneBackend:
+    def preload(self):
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+
+        import maya.cmds as cmds
+        import autorig.control_rig.module.registry as module_registry
+        import autorig.control_rig.module.template as module_template
+        import autorig.control_rig.feature.FK
+
+        module_registry.register_modules()
+        self.cmds = cmds
+        self.module_template = module_template
+
+    def open_scene(self, scene_path: str):
+        if scene_path:
+            self.cmds.file(scene_path, open=True, force=True)
+        else:
+            self.cmds.file(new=True, force=True)
+
+    def apply_template(self, job: BuildJob):
+        self.module_template.load_template(job.template_path, mirror=job.mirror)
+
+    def save_scene(self, output_path: str):
+        if not output_path:
+            return
+        file_type = "mayaBinary" if output_path.lower().endswith(".mb") else "mayaAscii"
+        self.cmds.file(rename=output_path)
+        self.cmds.file(save=True, force=True, type=file_type)
+
+#A fake scene under the real template planning. Jobs are planned by the same build_steps code as a Maya build, and
+#each step is applied to a plain record of modules with the same rules build_plan.run_step follows: modules can't be
+#created or mirrored over existing ones, features and mirrors need their module or source, and connections need both
+#ends. Scenes are saved and opened as JSON. Without the module registry every feature is planned as a single-module
+#feature unless multi_features says otherwise.
+
+class StandInSceneBackend:
+    def __init__(self, multi_features: dict[str, set[str]]|None = None):
+        self.multi_features = multi_features or {}
+        self.modules = {}
+        self.steps = []
+
+    def preload(self):
+        import autorig.control_rig.module.build_steps as build_steps
+        self.build_steps = build_steps
+
+    def open_scene(self, scene_path: str):
+        self.modules = {}
+        self.steps = []
+        if scene_path:
+            with open(scene_path, "r") as f:
+                self.modules = json.load(f)["modules"]
+
+    def apply_template(self, job: BuildJob):
+        with open(job.template_path, "r") as f:
+            data = json.load(f)
+
+        modules = self.build_steps.get_template_modules(data)
+        existing = [module for module in modules if module in self.modules]
+        if existing:
+            raise RuntimeError(f"Modules already exist in scene: {', '.join(existing)}.")
+
+        for step in self.build_steps.plan_steps(modules, self.multi_features, mirror=job.mirror):
+            self.run_step(step)
+            self.steps.append(step.label)
+
+    def run_step(self, step):
+        if step.kind == "connect":
+            for module, input_module in step.edges.items():
+                if module not in self.modules or input_module not in self.modules:
+                    raise RuntimeError(f"Can't connect {input_module} to {module}.")
+                self.modules[module]["input"] = input_module
+        elif step.kind == "create":
+            self.modules[step.module_name] = {"features": [], "input": None, "mirrored_from": None}
+        elif step.kind == "mirror":
+            if step.source_module not in self.modules:
+                raise RuntimeError(f"Module {step.module_name} could not be mirrored from {step.source_module}.")
+            self.modules[step.module_name] = {"features": list(self.modules[step.source_module]["features"]),
+                                              "input": None,
+                                              "mirrored_from": step.source_module}
+        elif step.kind in ("feature", "finalize"):
+            if step.module_name not in self.modules:
+                raise RuntimeError(f"Module {step.module_name} does not exist in scene.")
+            if step.kind == "feature":
+                self.modules[step.module_name]["features"].append(step.feature)
+        else:
+            raise RuntimeError(f"Unknown build step '{step.kind}' for {step.module_name}.")
+
+    def save_scene(self, output_path: str):
+        if not output_path:
+            return
+        with open(output_path, "w") as outfile:
+            json.dump({"modules": self.modules, "steps": self.steps}, outfile, indent=4)
+
+BUILD_BACKENDS = {"maya": MayaSceneBackend,
+                  "stand_in": StandInSceneBackend}
+
+#Queue helpers
+
+def get_queue_folder(queue_dir: str, folder: str) -> str:
+    return os.path.join(queue_dir, folder)
+
+def create_queue(queue_dir: str):
+    for folder in (PENDING_FOLDER, RUNNING_FOLDER, RESULTS_FOLDER):
+        os.makedirs(get_queue_folder(queue_dir, folder), exist_ok=True)
+
+#Files are written next to their destination and then moved into place, so workers never read a half written job.
+
+def write_json_atomic(file_path: str, data: dict):
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as outfile:
+        json.dump(data, outfile, indent=4)
+    os.replace(temp_path, file_path)
+
+def submit_job(queue_dir: str, template_path: str, scene_path: str = "", output_path: str = "",
+               mirror: bool = False) -> str:
+    create_queue(queue_dir)
+    job = BuildJob(job_id = uuid.uuid4().hex,
+                   template_path = os.path.abspath(template_path),
+                   scene_path = os.path.abspath(scene_path) if scene_path else "",
+                   output_path = os.path.abspath(output_path) if output_path else "",
+                   mirror = mirror,
+                   submitted = time.time())
+
+    #Job files are named by submit time so workers pick them up in order.
+    file_name = f"{int(job.submitted * 1000):015d}_{job.job_id}.json"
+    write_json_atomic(os.path.join(get_queue_folder(queue_dir, PENDING_FOLDER), file_name), asdict(job))
+    return job.job_id
+
+def get_result(queue_dir: str, job_id: str) -> BuildResult|None:
+    result_path = os.path.join(get_queue_folder(queue_dir, RESULTS_FOLDER), f"{job_id}.json")
+    if not os.path.exists(result_path):
+        return None
+    with open(result_path, "r") as f:
+        return BuildResult(**json.load(f))
+
+def wait_for_result(queue_dir: str, job_id: str, timeout: float|None = None,
+                    poll_interval: float = 0.1) -> BuildResult|None:
+    start = time.perf_counter()
+    while True:
+        result = get_result(queue_dir, job_id)
+        if result or (timeout is not None and time.perf_counter() - start > timeout):
+            return result
+        time.sleep(poll_interval)
+
+#Moving a job into the running folder claims it. Only one worker's rename can succeed. The claimed file is prefixed
+#with the worker's pid so the pool can find the jobs of a worker that died.
+
+def claim_job(queue_dir: str) -> tuple[BuildJob, str]|tuple[None, None]:
+    pending_folder = get_queue_folder(queue_dir, PENDING_FOLDER)
+    for file_name in sorted(f for f in os.listdir(pending_folder) if f.endswith(".json")):
+        running_path = os.path.join(get_queue_folder(queue_dir, RUNNING_FOLDER),
+                                    f"{os.getpid()}{CLAIM_SEPARATOR}{file_name}")
+        try:
+            os.rename(os.path.join(pending_folder, file_name), running_path)
+        except OSError:
+            continue
+
+        with open(running_path, "r") as f:
+            return BuildJob(**json.load(f)), running_path
+    return None, None
+
+#A job whose worker died is failed rather than requeued, since a job that crashed its worker would likely crash the
+#next one too. Jobs the worker finished before dying keep their result. Returns the IDs of the failed jobs.
+
+def fail_worker_jobs(queue_dir: str, worker_pid: int, error: str) -> list[str]:
+    running_folder = get_queue_folder(queue_dir, RUNNING_FOLDER)
+    prefix = f"{worker_pid}{CLAIM_SEPARATOR}"
+
+    failed = []
+    for file_name in sorted(f for f in os.listdir(running_folder) if f.startswith(prefix) and f.endswith(".json")):
+        running_path = os.path.join(running_folder, file_name)
+        with open(running_path, "r") as f:
+            job = BuildJob(**json.load(f))
+
+        if not get_result(queue_dir, job.job_id):
+            write_json_atomic(os.path.join(get_queue_folder(queue_dir, RESULTS_FOLDER), f"{job.job_id}.json"),
+                              asdict(BuildResult(job_id=job.job_id, success=False, worker=worker_pid, error=error)))
+            failed.append(job.job_id)
+        os.remove(running_path)
+    return failed
+
+def run_job(backend, job: BuildJob) -> BuildResult:
+    result = BuildResult(job_id=job.job_id, success=False, worker=os.getpid())
+    result.timings["queued"] = max(0.0, time.time() - job.submitted)
+
+    start = time.perf_counter()
+    try:
+        for stage, function, arg in (("open", backend.open_scene, job.scene_path),
+                                     ("apply", backend.apply_template, job),
+                                     ("save", backend.save_scene, job.output_path)):
+            stage_start = time.perf_counter()
+            function(arg)
+            result.timings[stage] = time.perf_counter() - stage_start
+        result.success = True
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+
+    result.timings["total"] = time.perf_counter() - start
+    return result
+
+def run_worker(queue_dir: str, backend_name: str = "maya", poll_interval: float = 0.1):
+    create_queue(queue_dir)
+    backend = BUILD_BACKENDS[backend_name]()
+
+    preload_start = time.perf_counter()
+    backend.preload()
+    preload_time = time.perf_counter() - preload_start
+
+    while not os.path.exists(os.path.join(queue_dir, STOP_FILE)):
+        job, running_path = claim_job(queue_dir)
+        if not job:
+            time.sleep(poll_interval)
+            continue
+
+        result = run_job(backend, job)
+        result.timings["preload"] = preload_time
+        write_json_atomic(os.path.join(get_queue_folder(queue_dir, RESULTS_FOLDER), f"{job.job_id}.json"),
+                          asdict(result))
+        os.remove(running_path)
+
+class BuildWorkerPool:
+    def __init__(self, queue_dir: str, worker_count: int|None = None, backend: str = "maya",
+                 executable: str|None = None):
+        if backend not in BUILD_BACKENDS:
+            raise ValueError(f"Unknown build backend '{backend}'. Expected one of {list(BUILD_BACKENDS)}.")
+
+        self.queue_dir = queue_dir
+        self.worker_count = worker_count or max(1, (os.cpu_count() or 2) - 1)
+        self.backend = backend
+        self.executable = executable
+        self.context = None
+        self.workers = []
+
+    def start(self):
+        create_queue(self.queue_dir)
+        stop_path = os.path.join(self.queue_dir, STOP_FILE)
+        if os.path.exists(stop_path):
+            os.remove(stop_path)
+
+        #Workers are spawned rather than forked so each one gets its own clean interpreter to load Maya into.
+        self.context = multiprocessing.get_context("spawn")
+        if self.executable:
+            self.context.set_executable(self.executable)
+
+        for _ in range(self.worker_count):
+            self.workers.append(self.start_worker())
+
+    def start_worker(self):
+        worker = self.context.Process(target=run_worker, args=(self.queue_dir, self.backend))
+        worker.start()
+        return worker
+
+    #Fails the jobs of any worker that died and starts a new worker in its place, unless the pool is stopping.
+    #Returns the IDs of the failed jobs.
+
+    def check_workers(self) -> list[str]:
+        stopping = os.path.exists(os.path.join(self.queue_dir, STOP_FILE))
+
+        failed = []
+        for i, worker in enumerate(self.workers):
+            if worker.is_alive():
+                continue
+
+            failed += fail_worker_jobs(self.queue_dir, worker.pid,
+                                       f"Worker {worker.pid} exited with code {worker.exitcode} during the build.")
+            if not stopping:
+                self.workers[i] = self.start_worker()
+        return failed
+
+    def stop(self, timeout: float|None = None):
+        open(os.path.join(self.queue_dir, STOP_FILE), "w").close()
+        for worker in self.workers:
+            worker.join(timeout)
+        self.workers = []
+
+    def submit(self, template_path: str, scene_path: str = "", output_path: str = "", mirror: bool = False) -> str:
+        return submit_job(self.queue_dir, template_path, scene_path, output_path, mirror)
+
+    #Workers are checked while waiting, so a job whose worker died gets a failed result instead of hanging.
+
+    def wait_for_result(self, job_id: str, timeout: float|None = None,
+                        poll_interval: float = 0.1) -> BuildResult|None:
+        start = time.perf_counter()
+        while True:
+            self.check_workers()
+            result = get_result(self.queue_dir, job_id)
+            if result or (timeout is not None and time.perf_counter() - start > timeout):
+                return result
+            time.sleep(poll_interval)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a pool of warm rig build workers on a local job queue.")
+    parser.add_argument("queue_dir")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backend", choices=list(BUILD_BACKENDS), default="maya")
+    args = parser.parse_args()
+
+    pool = BuildWorkerPool(args.queue_dir, args.workers, args.backend)
+    pool.start()
+    try:
+        while not os.path.exists(os.path.join(args.queue_dir, STOP_FILE)):
+            pool.check_workers()
+            time.sleep(1.0)
+        pool.stop()
+    except KeyboardInterrupt:
+        pool.stop()
+
+if __name__ == "__main__":
+    main()
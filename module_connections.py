@@ -0,0 +1,161 @@
+#Module connections are rewired as a set of edges rather than one pair at a time. Each edge maps a module to the
+#module it should take its input from, or None to disconnect it. The current connections are read once, only the edges
+#that actually change are rewired, and the inputModule and outputModules attributes are written once per module at the
+#end, all inside one undo chunk.
+#
+#A connected module's root is driven through an offset multMatrix by the attach joint of its input module, so the
+#module stays where it is when it is connected and follows the input module from then on.
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import autorig.control_rig.module.create_node as create_node
+import autorig.control_rig.module.query as module_query
+import autorig.control_rig.module.error as module_error
+import autorig.control_rig.module.tag_index as tag_index
+import autorig.control_rig.module.teardown as module_teardown
+
+def get_module_edges(module_groups: dict[str, str]) -> dict[str, str|None]:
+    edges = {}
+    for module_name, module_node in module_groups.items():
+        inputs = module_teardown.split_attr(cmds.getAttr(f"{module_node}.inputModule"))
+        edges[module_name] = inputs[0] if inputs else None
+    return edges
+
+def creates_cycle(module_name: str, input_module: str|None, edges: dict[str, str|None]) -> bool:
+    visited = set()
+    while input_module and input_module not in visited:
+        if input_module == module_name:
+            return True
+        visited.add(input_module)
+        input_module = edges.get(input_module)
+    return False
+
+def get_nodes_by_tag(index: dict, feature_type: str, key_tag: str) -> dict[str, str]:
+    return {index[node][key_tag]: node
+            for node in tag_index.filter_tag_index(index, {"featureType": feature_type})
+            if index[node].get(key_tag)}
+
+def matrix_to_list(matrix: om.MMatrix) -> list[float]:
+    return [matrix.getElement(row, column) for row in range(4) for column in range(4)]
+
+#Attach joints default to the last joint of the input module unless the module's attach_key says otherwise.
+
+def get_attach_joint(module_instance, input_instance, driver_joints: dict[str, str]) -> str|None:
+    joint_ID = module_instance.attach_key.get(input_instance.instance_module_name, input_instance.ID_list[-1])
+    return driver_joints.get(joint_ID)
+
+def disconnect_module_input(module_root: str, offset_node: str|None):
+    if not offset_node:
+        return
+    current_matrix = cmds.getAttr(f"{module_root}.offsetParentMatrix")
+    cmds.delete(offset_node)
+    cmds.setAttr(f"{module_root}.offsetParentMatrix", current_matrix, type="matrix")
+
+def connect_module_input(module_name: str, module_root: str, attach_joint: str):
+    offset_node = create_node.create_module_node("multMatrix", f"{module_name}_input_offset",
+                                                 {"moduleParent": module_name,
+                                                  "featureType": "module_input_offset"})
+
+    root_matrix = om.MMatrix(cmds.getAttr(f"{module_root}.offsetParentMatrix"))
+    joint_matrix = om.MMatrix(cmds.xform(attach_joint, query=True, worldSpace=True, matrix=True))
+    cmds.setAttr(f"{offset_node}.matrixIn[0]", matrix_to_list(root_matrix * joint_matrix.inverse()), type="matrix")
+
+    cmds.connectAttr(f"{attach_joint}.worldMatrix[0]", f"{offset_node}.matrixIn[1]")
+    cmds.connectAttr(f"{offset_node}.matrixSum", f"{module_root}.offsetParentMatrix", force=True)
+
+def validate_edge(module_name: str, input_module: str|None, module_groups: dict, instances: dict,
+                  edges: dict) -> bool:
+    if module_name not in module_groups:
+        module_error.send_warning(f"Module '{module_name}' does not exist in scene.")
+        return False
+    if not instances[module_name].allow_input:
+        module_error.send_warning(f"Module '{module_name}' does not allow an input.")
+        return False
+    if input_module is None:
+        return True
+    if input_module not in module_groups:
+        module_error.send_warning(f"Module '{input_module}' does not exist in scene.")
+        return False
+    if not instances[input_module].allow_output:
+        module_error.send_warning(f"Module '{input_module}' is not allowed to output.")
+        return False
+    if creates_cycle(module_name, input_module, edges):
+        module_error.send_warning(f"Connecting '{input_module}' to '{module_name}' would create a cycle.")
+        return False
+    return True
+
+#Returns only the edges that were actually rewired.
+
+def rewire_modules(edges: dict[str, str|None]) -> dict[str, str|None]:
+    index = tag_index.build_tag_index()
+    module_groups = module_teardown.get_module_groups(index)
+    current_edges = get_module_edges(module_groups)
+
+    instances = {}
+    for module_name in set(edges) | {i for i in edges.values() if i}:
+        module_cls = module_query.find_cls_module(module_name)
+        if module_cls:
+            instances[module_name] = module_cls.create_from_name(module_name)
+
+    new_edges = dict(current_edges)
+    changed = {}
+    for module_name, input_module in edges.items():
+        if current_edges.get(module_name) == input_module:
+            continue
+        if module_name not in instances or (input_module and input_module not in instances):
+            module_error.send_warning(f"No registered module class for '{module_name}' or '{input_module}'.")
+            continue
+        if not validate_edge(module_name, input_module, module_groups, instances, {**new_edges, module_name: input_module}):
+            continue
+        new_edges[module_name] = input_module
+        changed[module_name] = input_module
+
+    if not changed:
+        return changed
+
+    #Everything the rewiring needs is looked up from the tag index once, not per edge.
+    driver_joints = get_nodes_by_tag(index, "driver_joint", "jointID")
+    module_roots = get_nodes_by_tag(index, "module_root", "moduleParent")
+    offset_nodes = get_nodes_by_tag(index, "module_input_offset", "moduleParent")
+
+    cmds.undoInfo(openChunk=True, chunkName="rewire_modules")
+    try:
+        for module_name, input_module in list(changed.items()):
+            module_root = module_roots.get(module_name)
+            if not module_root:
+                module_error.send_warning(f"Module '{module_name}' has no root to connect.")
+                new_edges[module_name] = current_edges.get(module_name)
+                del changed[module_name]
+                continue
+
+            attach_joint = None
+            if input_module:
+                attach_joint = get_attach_joint(instances[module_name], instances[input_module], driver_joints)
+                if not attach_joint:
+                    module_error.send_warning(f"No attach joint found on '{input_module}' for '{module_name}'.")
+                    new_edges[module_name] = current_edges.get(module_name)
+                    del changed[module_name]
+                    continue
+
+            disconnect_module_input(module_root, offset_nodes.get(module_name))
+
+            if attach_joint:
+                connect_module_input(module_name, module_root, attach_joint)
+
+        #Connection attributes are written once per module, and only when their value changes.
+        for module_name, module_node in module_groups.items():
+            old_input = current_edges.get(module_name)
+            new_input = new_edges.get(module_name)
+            if old_input != new_input:
+                module_teardown.set_string_attr(module_node, "inputModule", [new_input] if new_input else [])
+
+            old_outputs = module_teardown.split_attr(cmds.getAttr(f"{module_node}.outputModules"))
+            new_outputs = [o for o in old_outputs if new_edges.get(o) == module_name]
+            new_outputs += [m for m, i in new_edges.items() if i == module_name and m not in new_outputs]
+            if new_outputs != old_outputs:
+                module_teardown.set_string_attr(module_node, "outputModules", new_outputs)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return changed
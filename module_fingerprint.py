@@ -0,0 +1,21 @@
+#Skeleton fingerprints are a hash of bind joint world matrices keyed by jointID. Hashing only needs the matrices, so it
+#lives apart from the Maya side of guide capture and can be used by tools that run without Maya, like the template
+#library.
+
+import hashlib
+
+FINGERPRINT_PRECISION = 4
+
+def fingerprint_matrices(ID_list: list[str], matrices: dict[str, list[float]]) -> str:
+    fingerprint = hashlib.sha1()
+    for joint_ID in ID_list:
+        matrix = matrices.get(joint_ID)
+        fingerprint.update(joint_ID.encode())
+        if not matrix:
+            fingerprint.update(b"missing")
+            continue
+
+        #Adding 0.0 folds -0.0 into 0.0 so tiny sign flips don't change the fingerprint.
+        fingerprint.update(";".join(f"{round(value, FINGERPRINT_PRECISION) + 0.0:.{FINGERPRINT_PRECISION}f}"
+                                    for value in matrix).encode())
+    return fingerprint.hexdigest()
@@ -0,0 +1,93 @@
+#Guide placement is the slowest part of most feature builds, and it gives the same result every time the skeleton
+#hasn't changed. Guide matrices are captured per module keyed by jointID, along with a fingerprint of the bind joints
+#they were placed from. Rebuilds against the same skeleton write the stored matrices back in one pass instead of
+#placing every guide again.
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import autorig.control_rig.module.query as module_query
+import autorig.control_rig.module.tag_index as tag_index
+
+from autorig.control_rig.module.fingerprint import fingerprint_matrices
+
+#Bind joints are found with one tag index pass instead of a scene scan per joint ID.
+
+def skeleton_fingerprint(ID_list: list[str]) -> str:
+    index = tag_index.build_tag_index(("featureType", "jointID"))
+    matrices = {index[node]["jointID"]: cmds.xform(node, query=True, worldSpace=True, matrix=True)
+                for node in tag_index.filter_tag_index(index, {"featureType": "bind_joint", "jointID": set(ID_list)})}
+    return fingerprint_matrices(ID_list, matrices)
+
+def get_guide_feature_types(module_instance) -> set[str]:
+    feature_types = set()
+    for feature in list(module_instance.initialized_features.values()) + list(module_instance.initialized_multi_features.values()):
+        feature_types.update(getattr(feature, "guide_feature_types", ()))
+    return feature_types
+
+#Matrices are stored in local space. Guides are driven through offsetParentMatrix, so their local values are all
+#that placement ever changes.
+
+def capture_module_guides(module_instance) -> dict:
+    guide_types = get_guide_feature_types(module_instance)
+    matrices = {}
+
+    for node in module_query.find_multiple_nodes({"moduleParent": module_instance.instance_module_name}):
+        feature_type = module_query.find_rig_attribute(node_name=node, attr="featureType")
+        if feature_type not in guide_types:
+            continue
+
+        joint_ID = module_query.find_rig_attribute(node_name=node, attr="jointID")
+        if not joint_ID:
+            continue
+
+        matrices.setdefault(joint_ID, {})[feature_type] = list(cmds.getAttr(f"{node}.matrix"))
+
+    if not matrices:
+        return {}
+
+    return {"fingerprint": skeleton_fingerprint(module_instance.ID_list),
+            "matrices": matrices}
+
+#Stored guides are only used when the skeleton still matches the one they were captured from.
+
+def get_valid_guides(module_instance) -> dict|None:
+    stored = getattr(module_instance, "stored_guides", None)
+    if not stored or not stored.get("matrices"):
+        return None
+
+    if stored.get("fingerprint") != skeleton_fingerprint(module_instance.ID_list):
+        return None
+
+    return stored["matrices"]
+
+def get_guide_matrix(guide_matrices: dict|None, joint_ID: str, feature_type: str) -> list[float]|None:
+    if not guide_matrices:
+        return None
+    return guide_matrices.get(joint_ID, {}).get(feature_type)
+
+#All stored matrices are decomposed and written through a single DG modifier rather than one command per node.
+
+def apply_local_matrices(node_matrices: dict[str, list[float]]):
+    if not node_matrices:
+        return
+
+    modifier = om.MDGModifier()
+    for node, matrix in node_matrices.items():
+        selection = om.MSelectionList()
+        selection.add(node)
+        node_fn = om.MFnDependencyNode(selection.getDependNode(0))
+
+        transform = om.MTransformationMatrix(om.MMatrix(matrix))
+        translate = transform.translation(om.MSpace.kTransform)
+        scale = transform.scale(om.MSpace.kTransform)
+        rotate = transform.rotation(asQuaternion=False)
+        rotate.reorderIt(node_fn.findPlug("rotateOrder", False).asInt())
+
+        for attr, values in (("translate", (translate.x, translate.y, translate.z)),
+                             ("rotate", (rotate.x, rotate.y, rotate.z)),
+                             ("scale", scale)):
+            for axis, value in zip("XYZ", values):
+                modifier.newPlugValueDouble(node_fn.findPlug(f"{attr}{axis}", False), value)
+
+    modifier.doIt()
@@ -15,6 +15,8 @@ import autorig.control_rig.feature.switch as feature_switch
 class ModuleHumanLeg(ModuleBase):
     #Name is defined at class level to be added to MODULE_REGISTRY for UI detection.
     cls_module_name = "human_leg"
+
+    source_modules = ModuleBase.source_modules + (feature_switch,)
     
     def __init__ (self, side, *args, **kwargs):
         super().__init__(side=side,*args, **kwargs)    
@@ -48,10 +50,17 @@ class ModuleHumanLeg(ModuleBase):
         return {"human_spine_M": "spine_M_1"}
     
     #ModuleLeg has additional checks in place to allow addition and removal of a switch system.
-    def add_feature(self,feature):
-        super().add_feature(feature)
-        if feature == "FK" or feature == "IK":
+    #Proxy builds have no switch, it is added once the module is upgraded.
+    def add_feature(self,feature,proxy=None):
+        if proxy is None:
+            proxy = self.proxy
+        super().add_feature(feature, proxy)
+        if not proxy and (feature == "FK" or feature == "IK"):
             self.check_switch()
+
+    def upgrade_proxy(self):
+        super().upgrade_proxy()
+        self.check_switch()
     
     def check_switch(self):
         features = cmds.getAttr(f"{self.instance_module_name}.moduleFeatures")
@@ -61,7 +70,8 @@ class ModuleHumanLeg(ModuleBase):
     def create_switch(self):
         ctrl, loc = feature_switch.make_switch(self.ID_list, self.instance_module_name)
 
-        cmds.parent(ctrl, f"{self.instance_module_name}|control")
-        cmds.parent(loc, f"{self.instance_module_name}|guide")
+        self.pending_parents.register("control_group", [ctrl])
+        self.pending_parents.register("guide_group", [loc])
+        self.flush_parenting()
 
         feature_switch.add_driver_switch(self.instance_module_name)
@@ -0,0 +1,263 @@
+#Symmetric modules don't need to run the query-create-place cycle twice. Once one side is built, its node plan is
+#recorded from the tagged nodes in the scene and replayed for the opposite side. Nodes are duplicated rather than
+#rebuilt by feature code, names and tags are remapped to the new side, and only the nodes that were actually placed
+#get a mirrored world matrix. Nodes placed through a static offsetParentMatrix, ex. proxy controls, get their offset
+#mirrored the same way.
+
+import re
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+from dataclasses import dataclass, field
+
+import autorig.control_rig.module.query as module_query
+import autorig.control_rig.module.error as module_error
+
+from autorig.control_rig.module.build_steps import MIRROR_SIDES, get_side
+
+#Axis that is flipped for each mirror plane.
+MIRROR_PLANES = {"YZ": 0, "XZ": 1, "XY": 2}
+
+#Module connections are rebuilt by the module connection logic, so they are not copied to the mirrored side.
+CONNECTION_ATTRS = ("inputModule", "outputModules")
+
+#Nodes that belong to the module's connection to its input module, rebuilt by the connection logic as well.
+CONNECTION_FEATURE_TYPES = ("module_input_offset",)
+
+IDENTITY_MATRIX = [1.0, 0.0, 0.0, 0.0,
+                   0.0, 1.0, 0.0, 0.0,
+                   0.0, 0.0, 1.0, 0.0,
+                   0.0, 0.0, 0.0, 1.0]
+
+@dataclass
+class NodeRecord:
+    name: str
+    parent: str|None = None
+    shapes: list[str] = field(default_factory=list)
+    tags: dict[str, str] = field(default_factory=dict)
+    world_matrix: list[float]|None = None
+    offset_matrix: list[float]|None = None
+
+@dataclass
+class ModulePlan:
+    module_name: str
+    side: str
+    nodes: list[NodeRecord] = field(default_factory=list)
+    connections: list[tuple[str, str]] = field(default_factory=list)
+
+def remap_side(value: str, source_side: str, target_side: str) -> str:
+    if not value or not source_side:
+        return value
+    return re.sub(rf"(?<=_){source_side}(?=_|\d|[A-Z]|$)", target_side, value)
+
+def remap_plug(plug: str, source_side: str, target_side: str) -> str:
+    node, attr = plug.split(".", 1)
+    return f"{remap_side(node, source_side, target_side)}.{attr}"
+
+def is_identity(matrix: list[float], tolerance: float = 1e-6) -> bool:
+    return all(abs(a - b) < tolerance for a, b in zip(matrix, IDENTITY_MATRIX))
+
+#Behavior mirror: positions are reflected across the plane and every axis is flipped, which keeps the matrix
+#right-handed so mirrored controls rotate the same way as the source side.
+
+def mirror_matrix(matrix: list[float], plane: str = "YZ") -> list[float]:
+    axis = MIRROR_PLANES[plane]
+    mirrored = list(matrix)
+    for row in range(4):
+        for column in range(3):
+            value = matrix[row * 4 + column]
+            if column == axis:
+                value = -value
+            if row < 3:
+                value = -value
+            mirrored[row * 4 + column] = value
+    return mirrored
+
+def get_tags(node: str) -> dict[str, str]:
+    tags = {}
+    for attr in cmds.listAttr(node, userDefined=True) or []:
+        if cmds.getAttr(f"{node}.{attr}", type=True) == "string":
+            tags[attr] = cmds.getAttr(f"{node}.{attr}") or ""
+    return tags
+
+def get_module_nodes(module_name: str) -> list[str]:
+    module_node = module_query.find_single_node({"moduleType": module_name})
+    if not module_node:
+        return []
+
+    nodes = [module_node]
+    nodes += cmds.listRelatives(module_node, allDescendents=True, type="transform", fullPath=True) or []
+    nodes += [node for node in module_query.find_multiple_nodes({"moduleParent": module_name})
+              if module_query.find_rig_attribute(node_name=node, attr="featureType") != "bind_joint"]
+
+    #Parents are listed before their children so the mirrored hierarchy can be built top down.
+    long_names = list(dict.fromkeys(cmds.ls(nodes, long=True)))
+    long_names.sort(key=lambda node: node.count("|"))
+    return cmds.ls(long_names)
+
+def record_module_plan(module_name: str) -> ModulePlan:
+    plan = ModulePlan(module_name=module_name, side=get_side(module_name))
+
+    nodes = [node for node in get_module_nodes(module_name)
+             if module_query.find_rig_attribute(node_name=node, attr="featureType") not in CONNECTION_FEATURE_TYPES]
+    plan_nodes = set(nodes)
+
+    for node in nodes:
+        record = NodeRecord(name=node, tags=get_tags(node))
+
+        if cmds.objectType(node, isAType="transform"):
+            parent = cmds.listRelatives(node, parent=True)
+            record.parent = parent[0] if parent else None
+            record.shapes = cmds.listRelatives(node, shapes=True, noIntermediate=True) or []
+
+            #Nodes with an untouched local matrix are fully driven by their parent and connections, so only
+            #placed nodes carry a matrix into the mirrored plan.
+            if not is_identity(cmds.getAttr(f"{node}.matrix")):
+                record.world_matrix = cmds.xform(node, query=True, worldSpace=True, matrix=True)
+
+            #Static offsets are recorded as the world space frame they put the node's local matrix in. Offsets driven
+            #from outside the plan, ex. a connected module root, are recorded as they are now and left unconnected.
+            offset = cmds.getAttr(f"{node}.offsetParentMatrix")
+            offset_sources = cmds.listConnections(f"{node}.offsetParentMatrix", source=True, destination=False) or []
+            if not any(source in plan_nodes for source in offset_sources) and not is_identity(offset):
+                parent_matrix = om.MMatrix(cmds.getAttr(f"{node}.parentMatrix[0]"))
+                record.offset_matrix = list(om.MMatrix(offset) * parent_matrix)
+
+        plan_nodes.update(record.shapes)
+        plan.nodes.append(record)
+
+    for node in plan_nodes:
+        connections = cmds.listConnections(node, source=True, destination=False, connections=True,
+                                           plugs=True, skipConversionNodes=True) or []
+        for destination, source in zip(connections[::2], connections[1::2]):
+            if source.split(".", 1)[0] in plan_nodes:
+                plan.connections.append((source, destination))
+
+    return plan
+
+def mirror_module_plan(plan: ModulePlan, target_module: str, plane: str = "YZ") -> ModulePlan:
+    source_side, target_side = plan.side, get_side(target_module)
+    mirrored = ModulePlan(module_name=target_module, side=target_side)
+
+    for record in plan.nodes:
+        tags = {attr: remap_side(value, source_side, target_side) for attr, value in record.tags.items()}
+        for attr in CONNECTION_ATTRS:
+            if attr in tags:
+                tags[attr] = ""
+
+        mirrored.nodes.append(NodeRecord(
+            name = remap_side(record.name, source_side, target_side),
+            parent = remap_side(record.parent, source_side, target_side) if record.parent else None,
+            shapes = [remap_side(shape, source_side, target_side) for shape in record.shapes],
+            tags = tags,
+            world_matrix = mirror_matrix(record.world_matrix, plane) if record.world_matrix else None,
+            offset_matrix = mirror_matrix(record.offset_matrix, plane) if record.offset_matrix else None
+        ))
+
+    mirrored.connections = [(remap_plug(source, source_side, target_side),
+                             remap_plug(destination, source_side, target_side))
+                            for source, destination in plan.connections]
+    return mirrored
+
+#Upstream nodes are placed first so a node's world matrix is set after everything that drives it.
+
+def get_placement_order(plan: ModulePlan) -> list[NodeRecord]:
+    records = {record.name: record for record in plan.nodes}
+    shape_owner = {shape: record.name for record in plan.nodes for shape in record.shapes}
+
+    dependencies = {name: set() for name in records}
+    for name, record in records.items():
+        if record.parent in records:
+            dependencies[name].add(record.parent)
+    for source, destination in plan.connections:
+        source_node = source.split(".", 1)[0]
+        destination_node = destination.split(".", 1)[0]
+        source_node = shape_owner.get(source_node, source_node)
+        destination_node = shape_owner.get(destination_node, destination_node)
+        if source_node in records and destination_node in records and source_node != destination_node:
+            dependencies[destination_node].add(source_node)
+
+    ordered = []
+    placed = set()
+    while len(placed) < len(records):
+        ready = [name for name in records if name not in placed and dependencies[name] <= placed]
+        if not ready:
+            ready = [name for name in records if name not in placed]
+        for name in ready:
+            placed.add(name)
+            ordered.append(records[name])
+
+    return [record for record in ordered if record.world_matrix or record.offset_matrix]
+
+def apply_module_plan(source_plan: ModulePlan, plan: ModulePlan) -> list[str]:
+    created = {}
+
+    for source_record, record in zip(source_plan.nodes, plan.nodes):
+        node_name = record.name.split("|")[-1]
+        is_dag = cmds.objectType(source_record.name, isAType="dagNode")
+        if is_dag:
+            new_node = cmds.duplicate(source_record.name, parentOnly=True)[0]
+        else:
+            new_node = cmds.duplicate(source_record.name, name=node_name)[0]
+
+        parent = created.get(record.parent)
+        if not parent and record.parent and cmds.objExists(record.parent):
+            parent = record.parent
+        if parent:
+            new_node = cmds.parent(new_node, parent, relative=True)[0]
+
+        #DAG nodes are renamed once they are under their new parent. Duplicates start next to their source, where
+        #shared group names like "control" or "guide" would clash and pick up a numbered suffix.
+        if is_dag:
+            new_node = cmds.rename(new_node, node_name)
+            new_node = cmds.ls(new_node, long=True)[0]
+        created[record.name] = new_node
+
+        for source_shape, shape in zip(source_record.shapes, record.shapes):
+            new_shape = cmds.duplicate(source_shape, addShape=True)[0]
+            new_shape = cmds.parent(new_shape, new_node, shape=True, relative=True)[0]
+            created[shape] = cmds.rename(new_shape, shape.split("|")[-1])
+
+        for attr, value in record.tags.items():
+            cmds.setAttr(f"{new_node}.{attr}", value, type="string")
+
+    for source, destination in plan.connections:
+        source_node, source_attr = source.split(".", 1)
+        destination_node, destination_attr = destination.split(".", 1)
+        cmds.connectAttr(f"{created.get(source_node, source_node)}.{source_attr}",
+                         f"{created.get(destination_node, destination_node)}.{destination_attr}",
+                         force=True)
+
+    #Offsets are set before world matrices so a node placed both ways keeps its local values relative to its offset.
+    for record in get_placement_order(plan):
+        node = created[record.name]
+        if record.offset_matrix:
+            parent_matrix = om.MMatrix(cmds.getAttr(f"{node}.parentMatrix[0]"))
+            offset = om.MMatrix(record.offset_matrix) * parent_matrix.inverse()
+            cmds.setAttr(f"{node}.offsetParentMatrix", list(offset), type="matrix")
+        if record.world_matrix:
+            cmds.xform(node, worldSpace=True, matrix=record.world_matrix)
+
+    return list(created.values())
+
+def mirror_module(source_module: str, target_module: str|None = None, plane: str = "YZ") -> list[str]:
+    source_side = get_side(source_module)
+    if not target_module:
+        if source_side not in MIRROR_SIDES:
+            module_error.send_warning(f"Module {source_module} has no side to mirror from.")
+            return []
+        target_module = f"{source_module.rsplit('_', 1)[0]}_{MIRROR_SIDES[source_side]}"
+
+    if plane not in MIRROR_PLANES:
+        cmds.error(f"Mirror plane must be one of {list(MIRROR_PLANES)}, not {plane}.")
+
+    if module_query.find_single_node({"moduleType": target_module}):
+        module_error.send_warning(f"Module {target_module} already exists in scene.")
+        return []
+
+    source_plan = record_module_plan(source_module)
+    if not source_plan.nodes:
+        module_error.send_warning(f"Module {source_module} has not been built.")
+        return []
+
+    plan = mirror_module_plan(source_plan, target_module, plane)
+    return apply_module_plan(source_plan, plan)
@@ -0,0 +1,104 @@
+#Features keep handles to the nodes they create instead of name strings. A handle resolves its node once, stays valid
+#if the node is renamed, and caches every plug it looks up. Connections and attribute values made through handles are
+#collected in a batch and applied with a single DG modifier, so build loops never format plug paths or resolve names.
+
+import re
+import maya.api.OpenMaya as om
+
+PLUG_PATTERN = re.compile(r"^(\w+)(?:\[(\d+)\])?$")
+
+class NodeHandle:
+    def __init__(self, node: str):
+        selection = om.MSelectionList()
+        selection.add(node)
+        self.mobject = selection.getDependNode(0)
+        self.handle = om.MObjectHandle(self.mobject)
+        self.node_fn = om.MFnDependencyNode(self.mobject)
+        self.plugs = {}
+
+    def __repr__(self):
+        return f"NodeHandle({self.name!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, NodeHandle) and self.handle == other.handle
+
+    def __hash__(self):
+        return self.handle.hashCode()
+
+    def is_valid(self) -> bool:
+        return self.handle.isValid()
+
+    #Current name of the node, for commands that still need a string.
+    @property
+    def name(self) -> str:
+        if not self.handle.isValid():
+            raise RuntimeError("Node referenced by handle no longer exists.")
+        if self.mobject.hasFn(om.MFn.kDagNode):
+            return om.MFnDagNode(self.mobject).partialPathName()
+        return self.node_fn.name()
+
+    #Plugs are written the same way as in a plug path, ex. "worldMatrix[0]" or "matrixIn[1]".
+    def plug(self, attr: str) -> om.MPlug:
+        plug = self.plugs.get(attr)
+        if plug is None:
+            match = PLUG_PATTERN.match(attr)
+            if not match:
+                raise ValueError(f"Unsupported plug '{attr}' on {self.name}.")
+            plug = self.node_fn.findPlug(match.group(1), False)
+            if match.group(2) is not None:
+                plug = plug.elementByLogicalIndex(int(match.group(2)))
+            self.plugs[attr] = plug
+        return plug
+
+#Connections are keyed by destination, so a forced connection later in a build replaces an earlier one instead of
+#being connected and disconnected again.
+
+class ConnectionBatch:
+    def __init__(self):
+        self.connections = {}
+        self.values = []
+        self.hidden = []
+
+    def connect(self, source: NodeHandle, source_attr: str, destination: NodeHandle, destination_attr: str,
+                force: bool = False):
+        key = (destination, destination_attr)
+        if key in self.connections and not force:
+            raise RuntimeError(f"{destination.name}.{destination_attr} is already connected in this batch.")
+        self.connections[key] = (source.plug(source_attr), destination.plug(destination_attr), force)
+
+    def set(self, node: NodeHandle, attr: str, value):
+        self.values.append((node.plug(attr), value))
+
+    #Hidden attributes are removed from the channel box and can no longer be keyed.
+    def hide(self, node: NodeHandle, attr: str = "visibility"):
+        self.hidden.append(node.plug(attr))
+
+    def apply(self):
+        modifier = om.MDGModifier()
+
+        for source_plug, destination_plug, force in self.connections.values():
+            if destination_plug.isDestination:
+                if not force:
+                    raise RuntimeError(f"{destination_plug.name()} is already connected.")
+                modifier.disconnect(destination_plug.source(), destination_plug)
+            modifier.connect(source_plug, destination_plug)
+
+        for plug, value in self.values:
+            if isinstance(value, om.MMatrix):
+                modifier.newPlugValue(plug, om.MFnMatrixData().create(value))
+            elif isinstance(value, bool):
+                modifier.newPlugValueBool(plug, value)
+            elif isinstance(value, int):
+                modifier.newPlugValueInt(plug, value)
+            else:
+                modifier.newPlugValueDouble(plug, value)
+
+        modifier.doIt()
+
+        for plug in self.hidden:
+            plug.isKeyable = False
+            plug.isChannelBox = False
+
+        self.connections = {}
+        self.values = []
+        self.hidden = []
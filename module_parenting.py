@@ -0,0 +1,37 @@
+#Organizational parenting is a deferred stage of the build. Features register the nodes they create with the group they
+#belong under, and the module reparents everything at once, with one group lookup and one parent command per group,
+#instead of looking up and reparenting into the same groups for every link of a chain.
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+import autorig.control_rig.module.query as module_query
+import autorig.control_rig.module.error as module_error
+
+from autorig.control_rig.module.node_handle import NodeHandle
+
+class ParentingQueue:
+    def __init__(self, module_name: str):
+        self.module_name = module_name
+        self.pending = {}
+
+    #Group types are the featureType of the module group, ex. "control_group" or "guide_group".
+    def register(self, group_type: str, nodes: list):
+        handles = [node if isinstance(node, NodeHandle) else NodeHandle(node) for node in nodes if node]
+        self.pending.setdefault(group_type, []).extend(handles)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for group_type, nodes in pending.items():
+            group_node = module_query.find_single_node(attrs = {'featureType': group_type,
+                                            'moduleParent': self.module_name})
+            if not group_node:
+                module_error.send_warning(f"No {group_type} found for {self.module_name}.")
+                continue
+
+            #Nodes already under the group are skipped, parenting them again would only raise a warning.
+            group = NodeHandle(group_node)
+            node_names = [node.name for node in dict.fromkeys(nodes)
+                          if node.is_valid() and om.MFnDagNode(node.mobject).parent(0) != group.mobject]
+            if node_names:
+                cmds.parent(node_names, group_node)
@@ -0,0 +1,48 @@
+#Running one tag query per feature type or per module means one full scene scan per query. The tag index reads the
+#requested rig tags off every tagged node in a single pass, and the result can then be filtered as many times as needed
+#without going back to the scene.
+
+import maya.api.OpenMaya as om
+
+DEFAULT_TAGS = ("moduleParent", "moduleType", "featureType", "jointID", "controlID")
+
+def get_node_name(mobject: om.MObject) -> str:
+    if mobject.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(mobject).partialPathName()
+    return om.MFnDependencyNode(mobject).name()
+
+#Returns {node name: {tag: value}} for every node carrying at least one of the tags.
+
+def build_tag_index(tags: tuple = DEFAULT_TAGS) -> dict[str, dict[str, str]]:
+    index = {}
+    node_iter = om.MItDependencyNodes()
+    while not node_iter.isDone():
+        mobject = node_iter.thisNode()
+        node_fn = om.MFnDependencyNode(mobject)
+
+        node_tags = {}
+        for tag in tags:
+            if node_fn.hasAttribute(tag):
+                node_tags[tag] = node_fn.findPlug(tag, False).asString()
+
+        if node_tags:
+            index[get_node_name(mobject)] = node_tags
+        node_iter.next()
+
+    return index
+
+#Each value in attrs can be a single value or a collection of accepted values.
+
+def filter_tag_index(index: dict[str, dict[str, str]], attrs: dict) -> list[str]:
+    nodes = []
+    for node, node_tags in index.items():
+        for tag, accepted in attrs.items():
+            value = node_tags.get(tag)
+            if isinstance(accepted, str):
+                if value != accepted:
+                    break
+            elif value not in accepted:
+                break
+        else:
+            nodes.append(node)
+    return nodes
@@ -0,0 +1,90 @@
+#Features and modules are torn down by tag rather than piece by piece. Every node tagged with the module and one of the
+#feature's featureTypes is collected from one tag index pass and deleted with a single delete command, and the module
+#attributes that referenced the removed features or modules are rewritten in the same pass.
+
+import maya.cmds as cmds
+
+import autorig.control_rig.module.tag_index as tag_index
+import autorig.control_rig.module.connections as module_connections
+
+#Bind joints are tagged with their module but belong to the skeleton, so teardown never deletes them.
+PROTECTED_FEATURE_TYPES = ("bind_joint",)
+
+def split_attr(value: str|None) -> list[str]:
+    return [v for v in (value or "").split(";") if v]
+
+def get_feature_node_types(module_instance, feature: str) -> tuple:
+    instance_feature = module_instance.initialized_features.get(feature) or module_instance.initialized_multi_features.get(feature)
+    return getattr(instance_feature, "feature_node_types", ())
+
+def get_module_groups(index: dict) -> dict[str, str]:
+    return {index[node]["moduleType"]: node
+            for node in tag_index.filter_tag_index(index, {"featureType": "module_group"})
+            if index[node].get("moduleType")}
+
+def set_string_attr(node: str, attr: str, values: list[str]):
+    cmds.setAttr(f"{node}.{attr}", ";".join(values), type="string")
+
+def delete_nodes(nodes: list[str]):
+    nodes = [node for node in dict.fromkeys(nodes) if cmds.objExists(node)]
+    if nodes:
+        cmds.delete(nodes)
+
+#Removes the same features from any number of modules, ex. IK from every limb, with one scene scan and one delete.
+
+def remove_features(module_instances: list, features: list[str]):
+    index = tag_index.build_tag_index()
+    module_groups = get_module_groups(index)
+
+    nodes = []
+    for module_instance in module_instances:
+        module_name = module_instance.instance_module_name
+        feature_types = set()
+        for feature in features:
+            feature_types.update(get_feature_node_types(module_instance, feature))
+        feature_types.difference_update(PROTECTED_FEATURE_TYPES)
+
+        nodes += tag_index.filter_tag_index(index, {"moduleParent": module_name,
+                                                    "featureType": feature_types})
+
+        module_node = module_groups.get(module_name)
+        if module_node:
+            module_features = split_attr(cmds.getAttr(f"{module_node}.moduleFeatures"))
+            set_string_attr(module_node, "moduleFeatures", [f for f in module_features if f not in features])
+
+    delete_nodes(nodes)
+
+#Removes whole modules and clears them from the inputModule and outputModules of every module left in the scene.
+#Modules left in the scene that took their input from a removed module are disconnected first, so their root keeps
+#its current place instead of jumping when the attach joint driving it is deleted.
+
+def remove_modules(module_names: list[str]):
+    index = tag_index.build_tag_index()
+    module_groups = get_module_groups(index)
+    removed = set(module_names)
+
+    nodes = [node for node in tag_index.filter_tag_index(index, {"moduleParent": removed})
+             if index[node].get("featureType") not in PROTECTED_FEATURE_TYPES]
+    nodes += [module_groups[name] for name in module_names if name in module_groups]
+
+    module_roots = module_connections.get_nodes_by_tag(index, "module_root", "moduleParent")
+    offset_nodes = module_connections.get_nodes_by_tag(index, "module_input_offset", "moduleParent")
+
+    for module_name, module_node in module_groups.items():
+        if module_name in removed:
+            continue
+
+        inputs = split_attr(cmds.getAttr(f"{module_node}.inputModule"))
+        if inputs and inputs[0] in removed and module_name in module_roots:
+            module_connections.disconnect_module_input(module_roots[module_name], offset_nodes.get(module_name))
+
+        for attr in ("inputModule", "outputModules"):
+            values = split_attr(cmds.getAttr(f"{module_node}.{attr}"))
+            remaining = [v for v in values if v not in removed]
+            if remaining != values:
+                set_string_attr(module_node, attr, remaining)
+
+    delete_nodes(nodes)
+
+def clear_rig():
+    remove_modules(list(get_module_groups(tag_index.build_tag_index())))
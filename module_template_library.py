@@ -0,0 +1,300 @@
+#Shared template folders hold far more templates than anyone can open one by one. The template library keeps a local
+#SQLite index of every template's modules, features, required jointIDs and skeleton fingerprints. Only files whose
+#modified time or size changed are read again when the index is updated, and files that are gone are dropped.
+#Searching reads the scene's tagged bind joints once and ranks the indexed templates by how well they fit that
+#skeleton, all in one query.
+#
+#Templates saved before joint IDs were recorded can only be resolved through the module classes. Files with a module
+#that can't be resolved are marked unresolved: their templates are left out of searches, they are reported by every
+#update and they are read again on the next one, ex. once the update runs inside Maya with the module registry.
+#
+#Indexing and searching with given scene joints only read template files, so they run without Maya. Maya is only
+#imported to read the scene's bind joints.
+
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+from autorig.control_rig.module.fingerprint import fingerprint_matrices
+
+INDEX_VERSION = 2
+
+INDEX_PATH_ENV = "AUTORIG_TEMPLATE_INDEX"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    resolved INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS templates (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    template_name TEXT NOT NULL,
+    resolved INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS modules (
+    template_id INTEGER NOT NULL REFERENCES templates(id) ON DELETE CASCADE,
+    module_name TEXT NOT NULL,
+    fingerprint TEXT,
+    joint_IDs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS features (
+    template_id INTEGER NOT NULL REFERENCES templates(id) ON DELETE CASCADE,
+    module_name TEXT NOT NULL,
+    feature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS required_joints (
+    template_id INTEGER NOT NULL REFERENCES templates(id) ON DELETE CASCADE,
+    joint_ID TEXT NOT NULL,
+    PRIMARY KEY (template_id, joint_ID)
+);
+CREATE INDEX IF NOT EXISTS required_joints_joint_ID ON required_joints (joint_ID);
+CREATE INDEX IF NOT EXISTS modules_template_id ON modules (template_id);
+CREATE INDEX IF NOT EXISTS features_template_id ON features (template_id);
+"""
+
+@dataclass
+class TemplateMatch:
+    path: str
+    template_name: str
+    coverage: float
+    required_count: int
+    matching_fingerprints: int
+    module_count: int
+    modules: list[str] = field(default_factory=list)
+    missing_joint_IDs: list[str] = field(default_factory=list)
+
+def get_index_path() -> str:
+    return os.environ.get(INDEX_PATH_ENV) or os.path.join(os.path.expanduser("~"), ".autorig", "template_index.sqlite")
+
+#An index from an older version is rebuilt from scratch rather than migrated.
+
+def open_index(index_path: str|None = None) -> sqlite3.Connection:
+    index_path = index_path or get_index_path()
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+
+    connection = sqlite3.connect(index_path)
+    connection.execute("PRAGMA foreign_keys = ON")
+    if connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+        connection.executescript("DROP TABLE IF EXISTS required_joints; DROP TABLE IF EXISTS features;"
+                                 "DROP TABLE IF EXISTS modules; DROP TABLE IF EXISTS templates;"
+                                 "DROP TABLE IF EXISTS files;")
+        connection.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    connection.executescript(SCHEMA)
+    return connection
+
+def find_template_files(folders: list[str], recursive: bool = True) -> dict[str, os.stat_result]:
+    files = {}
+    for folder in folders:
+        for root, dirs, file_names in os.walk(folder):
+            for file_name in file_names:
+                if file_name.lower().endswith(".json"):
+                    path = os.path.abspath(os.path.join(root, file_name))
+                    files[path] = os.stat(path)
+            if not recursive:
+                break
+    return files
+
+#Templates saved before joint IDs were recorded fall back to the module classes, which needs the module registry, and
+#then to the joint IDs their guides were stored under. Returns None when none of those are available.
+
+def get_module_joint_IDs(module_name: str, module_data: dict) -> list[str]|None:
+    joint_IDs = module_data.get("joint_IDs")
+    if joint_IDs is not None:
+        return list(joint_IDs)
+
+    try:
+        import autorig.control_rig.module.query as module_query
+        module_cls = module_query.find_cls_module(module_name)
+    except ImportError:
+        module_cls = None
+    if module_cls:
+        return list(module_cls.create_from_name(module_name).ID_list)
+
+    guide_matrices = module_data.get("guides", {}).get("matrices")
+    if guide_matrices:
+        return list(guide_matrices)
+    return None
+
+#Every top level entry with modules is a template, anything else in the file (ex. comments) is skipped.
+
+def get_file_templates(data) -> dict[str, dict]:
+    if not isinstance(data, dict):
+        raise ValueError("Template file is not a JSON object.")
+    return {name: value["modules"] for name, value in data.items()
+            if isinstance(value, dict) and isinstance(value.get("modules"), dict)}
+
+#Returns whether every module of every template in the file could be resolved to its joint IDs.
+
+def index_file(connection: sqlite3.Connection, path: str, stat: os.stat_result) -> bool:
+    with open(path, "r") as f:
+        data = json.load(f)
+    templates = get_file_templates(data)
+
+    connection.execute("DELETE FROM files WHERE path = ?", (path,))
+    file_id = connection.execute("INSERT INTO files (path, mtime, size, resolved) VALUES (?, ?, ?, 1)",
+                                 (path, stat.st_mtime, stat.st_size)).lastrowid
+
+    file_resolved = True
+    for template_name, modules in templates.items():
+        template_id = connection.execute("INSERT INTO templates (file_id, template_name, resolved) VALUES (?, ?, 1)",
+                                         (file_id, template_name)).lastrowid
+
+        required = set()
+        resolved = True
+        for module_name, module_data in modules.items():
+            joint_IDs = get_module_joint_IDs(module_name, module_data)
+            if joint_IDs is None:
+                resolved = False
+                joint_IDs = []
+            required.update(joint_IDs)
+            connection.execute("INSERT INTO modules (template_id, module_name, fingerprint, joint_IDs) VALUES (?, ?, ?, ?)",
+                               (template_id, module_name, module_data.get("guides", {}).get("fingerprint"),
+                                json.dumps(joint_IDs)))
+            connection.executemany("INSERT INTO features (template_id, module_name, feature) VALUES (?, ?, ?)",
+                                   [(template_id, module_name, feature) for feature in module_data.get("features", [])])
+
+        #An incomplete requirement set would overstate coverage, so unresolved templates store none.
+        if resolved:
+            connection.executemany("INSERT INTO required_joints (template_id, joint_ID) VALUES (?, ?)",
+                                   [(template_id, joint_ID) for joint_ID in sorted(required)])
+        else:
+            connection.execute("UPDATE templates SET resolved = 0 WHERE id = ?", (template_id,))
+            file_resolved = False
+
+    if not file_resolved:
+        connection.execute("UPDATE files SET resolved = 0 WHERE id = ?", (file_id,))
+    return file_resolved
+
+#Only files that are new, unresolved or whose modified time or size changed are parsed. Indexed files under the given
+#folders that no longer exist are removed. Files that fail to parse are reported and left out of the index.
+
+def update_index(folders: list[str], index_path: str|None = None, recursive: bool = True) -> dict:
+    start = time.perf_counter()
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "errors": {}, "unresolved": []}
+
+    folders = [os.path.abspath(folder) for folder in folders]
+    files = find_template_files(folders, recursive)
+
+    connection = open_index(index_path)
+    try:
+        with connection:
+            indexed = {path: (mtime, size, resolved) for path, mtime, size, resolved
+                       in connection.execute("SELECT path, mtime, size, resolved FROM files")}
+
+            for path, stat in files.items():
+                if path in indexed and indexed[path] == (stat.st_mtime, stat.st_size, 1):
+                    stats["unchanged"] += 1
+                    continue
+                try:
+                    resolved = index_file(connection, path, stat)
+                except (OSError, ValueError, AttributeError, TypeError) as e:
+                    connection.execute("DELETE FROM files WHERE path = ?", (path,))
+                    stats["errors"][path] = str(e)
+                    continue
+                if not resolved:
+                    stats["unresolved"].append(path)
+                stats["updated" if path in indexed else "added"] += 1
+
+            removed = [path for path in indexed if path not in files
+                       and any(os.path.commonpath([path, folder]) == folder for folder in folders)]
+            connection.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+            stats["removed"] = len(removed)
+    finally:
+        connection.close()
+
+    stats["time"] = time.perf_counter() - start
+    return stats
+
+#Returns {jointID: world matrix} for every bind joint in the scene, found with one tag index pass.
+
+def get_scene_joints() -> dict[str, list[float]]:
+    import maya.cmds as cmds
+    import autorig.control_rig.module.tag_index as tag_index
+
+    index = tag_index.build_tag_index(("featureType", "jointID"))
+    return {index[node]["jointID"]: cmds.xform(node, query=True, worldSpace=True, matrix=True)
+            for node in tag_index.filter_tag_index(index, {"featureType": "bind_joint"})
+            if index[node].get("jointID")}
+
+#Templates are ranked by the share of their required joints the skeleton has, then by how many of their modules were
+#saved against the same bind pose, then by size. Coverage is counted in SQL against a temporary table of the scene's
+#joint IDs, fingerprints are only compared for the templates that pass.
+
+def find_templates(scene_joints: dict[str, list[float]]|None = None, index_path: str|None = None,
+                   min_coverage: float = 1.0, limit: int|None = None) -> list[TemplateMatch]:
+    if scene_joints is None:
+        scene_joints = get_scene_joints()
+
+    has_matrices = any(scene_joints.values())
+
+    connection = open_index(index_path)
+    try:
+        connection.execute("CREATE TEMP TABLE scene_joints (joint_ID TEXT PRIMARY KEY)")
+        connection.executemany("INSERT INTO scene_joints (joint_ID) VALUES (?)", [(j,) for j in scene_joints])
+
+        rows = connection.execute("""
+            SELECT templates.id, files.path, templates.template_name,
+                   COUNT(required_joints.joint_ID), COUNT(scene_joints.joint_ID)
+            FROM templates
+            JOIN files ON files.id = templates.file_id
+            JOIN required_joints ON required_joints.template_id = templates.id
+            LEFT JOIN scene_joints ON scene_joints.joint_ID = required_joints.joint_ID
+            WHERE templates.resolved = 1
+            GROUP BY templates.id
+            HAVING COUNT(scene_joints.joint_ID) >= ? * COUNT(required_joints.joint_ID)
+            """, (min_coverage,)).fetchall()
+
+        matches = []
+        for template_id, path, template_name, required_count, matched_count in rows:
+            modules = connection.execute("SELECT module_name, fingerprint, joint_IDs FROM modules WHERE template_id = ?",
+                                         (template_id,)).fetchall()
+
+            matching_fingerprints = 0
+            if has_matrices:
+                for _, fingerprint, joint_IDs in modules:
+                    if fingerprint and fingerprint == fingerprint_matrices(json.loads(joint_IDs), scene_joints):
+                        matching_fingerprints += 1
+
+            missing = []
+            if matched_count < required_count:
+                missing = [j for (j,) in connection.execute(
+                    """SELECT joint_ID FROM required_joints WHERE template_id = ?
+                       AND joint_ID NOT IN (SELECT joint_ID FROM scene_joints) ORDER BY joint_ID""",
+                    (template_id,))]
+
+            matches.append(TemplateMatch(path = path,
+                                         template_name = template_name,
+                                         coverage = matched_count / required_count,
+                                         required_count = required_count,
+                                         matching_fingerprints = matching_fingerprints,
+                                         module_count = len(modules),
+                                         modules = sorted(module_name for module_name, _, _ in modules),
+                                         missing_joint_IDs = missing))
+    finally:
+        connection.close()
+
+    matches.sort(key=lambda m: (-m.coverage, -m.matching_fingerprints, -m.required_count, m.path, m.template_name))
+    return matches[:limit] if limit else matches
+
+def get_template_features(path: str, template_name: str, index_path: str|None = None) -> dict[str, list[str]]:
+    connection = open_index(index_path)
+    try:
+        rows = connection.execute("""
+            SELECT features.module_name, features.feature FROM features
+            JOIN templates ON templates.id = features.template_id
+            JOIN files ON files.id = templates.file_id
+            WHERE files.path = ? AND templates.template_name = ?
+            """, (os.path.abspath(path), template_name)).fetchall()
+    finally:
+        connection.close()
+
+    features = {}
+    for module_name, feature in rows:
+        features.setdefault(module_name, []).append(feature)
+    return features
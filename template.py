@@ -1,97 +1,107 @@
 #Module parts of my toolset can be expanded by editing or adding classes. However, to allow artists to package modules into full rigs
 #like a human for example, the UI user can export the systems they've added to a .json file to be read later. The file will be parsed to
 #call the same functions that the UI does, but at a later time on a rig with the same skeletal heirarchy.
+#
+#Template I/O has no UI so batch builds and workers can use it without loading Qt. Functions take paths and return the
+#template data along with how long each stage took. Dialogs live in the Module Builder's template UI.
 
 import maya.cmds as cmds
 import json
+import time
 
+import autorig.control_rig.module.build_plan as build_plan
+import autorig.control_rig.module.error as module_error
+import autorig.control_rig.module.guides as module_guides
 import autorig.control_rig.module.query as module_query
+import autorig.control_rig.module.tag_index as tag_index
 
-from PySide2.QtWidgets import QFileDialog
-
-def save_as_template(template_name):
-    file_path, _ = QFileDialog.getSaveFileName(
-            None,
-            "Save Rig Template",
-            "",                     
-            "JSON Files (*.json)"   
-        )
-
-    if not file_path:
-        return
+from autorig.control_rig.module.teardown import split_attr, get_module_groups
 
+def get_template_path(file_path: str) -> str:
     if not file_path.lower().endswith(".json"):
         file_path += ".json"
-    
+    return file_path
+
+#Module groups are found with one tag index pass instead of checking every transform in the scene.
+
+def collect_template_data(template_name: str = "human") -> dict:
     data = {}
-    
     data[template_name] = {}
     data[template_name]["modules"] = {}
 
-    for n in cmds.ls(type="transform"):
-        if not "joint" in n:
-            if cmds.objExists(f"{n}.moduleType"):
-                data[template_name]["modules"][cmds.getAttr(f"{n}.moduleType")] = {}
-                
-                features = cmds.getAttr(f"{n}.moduleFeatures")
-                if features:
-                    features_list = [f for f in features.split(";") if f]
-                else:
-                    features_list = []
-                
-                inputs = cmds.getAttr(f"{n}.inputModule")
-                if inputs:
-                    inputs_list = [i for i in inputs.split(";") if i]
-                else:
-                    inputs_list = []
-
-
-                outputs = cmds.getAttr(f"{n}.outputModules")
-                if outputs:
-                    outputs_list = [o for o in outputs.split(";") if o]
-                else:
-                    outputs_list = []
-                
-                data[template_name]["modules"][cmds.getAttr(f"{n}.moduleType")]["features"] = features_list
-                data[template_name]["modules"][cmds.getAttr(f"{n}.moduleType")]["inputs"] = inputs_list
-                data[template_name]["modules"][cmds.getAttr(f"{n}.moduleType")]["outputs"] = outputs_list
+    for module_type, n in get_module_groups(tag_index.build_tag_index()).items():
+        module_data = {}
+        module_data["features"] = split_attr(cmds.getAttr(f"{n}.moduleFeatures"))
+        module_data["inputs"] = split_attr(cmds.getAttr(f"{n}.inputModule"))
+        module_data["outputs"] = split_attr(cmds.getAttr(f"{n}.outputModules"))
 
-    try:
-        with open(file_path, "w") as outfile:
-            json.dump(data, outfile, indent=4)
+        #Joint IDs are recorded so the template library can match templates to skeletons without the module classes.
+        #Modules without a registered class are still saved, just without joint IDs or guides.
+        module_cls = module_query.find_cls_module(module_type)
+        if not module_cls:
+            module_error.send_warning(f"No registered module class for {module_type}, its joint IDs and guides aren't saved.")
+            data[template_name]["modules"][module_type] = module_data
+            continue
 
-        cmds.confirmDialog(
-            title="Success",
-            message=f"File saved:\n{file_path}",
-            button=["OK"]
-        )
-    except Exception as e:
-        cmds.error(f"Failed to save file: {e}")
+        module_instance = module_cls.create_from_name(module_type)
+        module_data["joint_IDs"] = module_instance.ID_list
+
+        #Guide matrices let a rebuild against the same skeleton skip guide placement.
+        guides = module_guides.capture_module_guides(module_instance)
+        if guides:
+            module_data["guides"] = guides
+
+        data[template_name]["modules"][module_type] = module_data
 
     return data
 
-def load_template(file_path):
+def write_template(data: dict, file_path: str) -> str:
+    file_path = get_template_path(file_path)
+    with open(file_path, "w") as outfile:
+        json.dump(data, outfile, indent=4)
+    return file_path
+
+def save_template(file_path: str, template_name: str = "human") -> tuple[dict, dict]:
+    timings = {}
+
+    start = time.perf_counter()
+    data = collect_template_data(template_name)
+    timings["collect"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_template(data, file_path)
+    timings["write"] = time.perf_counter() - start
+
+    return data, timings
+
+def read_template(file_path):
     with open(file_path, "r") as f:
-            data = json.load(f)
-    module_list = list(data['human']['modules'].keys())
-    
-    for module in module_list:
-        module_cls = module_query.find_cls_module(module)
-        module_instance = module_cls.create_from_name(module)
-        module_instance.create_module()
-
-    for module in module_list:    
-        module_cls = module_query.find_cls_module(module)
-        module_instance = module_cls.create_from_name(module)
-        
-        features = data['human']['modules'][module]['features']
-        for feature in features:
-            module_instance.add_feature(feature)
-    
-        inputs = data['human']['modules'][module]['inputs']
-        if inputs:
-            for input in inputs:
-                input_module_cls = module_query.find_cls_module(input)
-                input_module_instance = input_module_cls.create_from_name(input)
-                
-                module_instance.add_module_connection(input_module_instance,module_instance)
+        data = json.load(f)
+    return data
+
+#Template loading runs the same build steps as the chunked build runner, just all at once.
+
+def load_template(file_path, mirror=False, mirror_plane="YZ", use_cache=True, proxy=False) -> tuple[dict, dict]:
+    timings = {}
+
+    start = time.perf_counter()
+    data = read_template(file_path)
+    timings["read"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    errors = build_plan.validate_template_build(data, scene_modules=build_plan.get_scene_modules())
+    if errors:
+        cmds.error("\n".join(errors))
+    steps = build_plan.plan_template_build(data, mirror=mirror, mirror_plane=mirror_plane)
+    timings["plan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    context = build_plan.BuildContext(use_cache=use_cache, proxy=proxy)
+    try:
+        build_plan.run_plan(steps, context)
+    except Exception:
+        build_plan.rollback_build(context)
+        raise
+    timings["build"] = time.perf_counter() - start
+
+    return data, timings
@@ -3,7 +3,7 @@
 
 #UI initialization abridged for brevity.
 
-from PySide2.QtWidgets import QListWidget, QFileDialog, QWidget, QLabel, QVBoxLayout, QHBoxLayout
+from PySide2.QtWidgets import QListWidget, QWidget, QLabel, QVBoxLayout, QHBoxLayout, QProgressDialog
 
 from common.ui.base import UIBase
 import common.ui.widget as widgets
@@ -13,6 +13,11 @@ import autorig.control_rig.module.registry as module_registry
 import autorig.control_rig.module.skeleton as module_skeleton 
 import autorig.control_rig.module.template as module_template
 import autorig.control_rig.module.error as module_error
+import autorig.control_rig.module.build_runner as module_build_runner
+import autorig.control_rig.module.mirror as module_mirror
+import autorig.control_rig.module.connections as module_connections
+
+import autorig.control_rig.module_builder.ui.template as ui_template
 
 from autorig.control_rig.module_builder.ui.edit_module import EditModule
 
@@ -22,6 +27,8 @@ class ModuleBuilder(UIBase):
         super().__init__(*args, **kwargs)
         self.selected_module=None
         self.module_instance = None
+        self.build_runner = None
+        self.build_progress = None
         self.create_widgets()
         self.create_layouts()
         self.populate_modules_from_scene()
@@ -49,6 +56,8 @@ class ModuleBuilder(UIBase):
         
         self.module_list = QListWidget()
         self.module_list.itemClicked.connect(self.on_module_clicked)
+
+        self.mirror_button = widgets.initialize_button_widget("Mirror", self.mirror_module, enabled=False)
         
         self.module_input_label = QLabel("Upstream Inputs")
         
@@ -68,6 +77,7 @@ class ModuleBuilder(UIBase):
             layout_type = QVBoxLayout(),
             widgets = [self.module_list_label,
                        self.module_list,
+                       self.mirror_button,
                        ]
         )
 
@@ -117,6 +127,7 @@ class ModuleBuilder(UIBase):
     def enable_add_buttons(self):
         self.input_add_button.setEnabled(True)      
         self.output_add_button.setEnabled(True)
+        self.mirror_button.setEnabled(True)
     
     def disable_edit_buttons(self):
         self.input_add_button.setEnabled(False)       
@@ -124,6 +135,7 @@ class ModuleBuilder(UIBase):
         self.input_remove_button.setEnabled(False)
         self.features_remove_button.setEnabled(False)
         self.output_remove_button.setEnabled(False)
+        self.mirror_button.setEnabled(False)
 
     def clear_module_lists(self):
         self.module_features_list.clear()
@@ -204,6 +216,12 @@ class ModuleBuilder(UIBase):
 
         self.enable_add_buttons()
 
+    #Builds the opposite side of the selected module from its recorded node plan instead of rebuilding it.
+    def mirror_module(self):
+        created = module_mirror.mirror_module(self.module_instance.instance_module_name)
+        if created:
+            self.populate_modules_from_scene()
+
     def open_add_feature(self):
         potential_feature_list = self.module_instance.initialized_features.keys()
 
@@ -273,31 +291,24 @@ class ModuleBuilder(UIBase):
         input_ui = EditModule('Input', potential_input_list)
         input_ui.confirmed_features.connect(self.add_input)            
         
+    #Connections are changed through the batched module rewiring, which also updates the connection attributes.
     def add_input(self, inputs):
-        base_instance = self.module_instance
+        base_name = self.module_instance.instance_module_name
         
-        input_cls = module_query.find_cls_module(inputs[0])
-        input_instance = input_cls.create_from_name(inputs[0]) 
-        
-        base_instance.add_module_connection(input_instance,base_instance)
+        changed = module_connections.rewire_modules({base_name: inputs[0]})
 
-        self.module_input_list.clear()
-        self.module_input_list.addItem(input_instance.instance_module_name)
+        if base_name in changed:
+            self.module_input_list.clear()
+            self.module_input_list.addItem(inputs[0])
           
     def remove_input(self):
-        base_instance = self.module_instance
-        
-        input_cls = module_query.find_cls_module(self.module_input_list.selectedItems()[0].text())
-        input_instance = input_cls.create_from_name(self.module_input_list.selectedItems()[0].text())
-
-        if base_instance.allow_input:           
-            base_instance.remove_module_connection(input_instance,base_instance)
+        base_name = self.module_instance.instance_module_name
+        input_name = self.module_input_list.selectedItems()[0].text()
 
-        input_instance.remove_output_attr(base_instance.instance_module_name)
-        base_instance.remove_input_attr()
+        module_connections.rewire_modules({base_name: None})
 
         for i in range(self.module_input_list.count()):
-            if self.module_input_list.item(i).text() == input_instance.instance_module_name:
+            if self.module_input_list.item(i).text() == input_name:
                 self.module_input_list.takeItem(i)
                 break
 
@@ -343,48 +354,68 @@ class ModuleBuilder(UIBase):
 
     def add_output(self, outputs):
         base_instance = self.module_instance
-        
-        output_cls = module_query.find_cls_module(outputs[0])
-        output_instance = output_cls.create_from_name(outputs[0]) 
 
-        output_instance.add_module_connection(base_instance,output_instance)
+        module_connections.rewire_modules({output: base_instance.instance_module_name for output in outputs})
 
         module_outputs = module_query.find_rig_attribute(node_name = base_instance.instance_module_name,
                                  attr = "outputModules")
         self.module_output_list.clear()
-        self.populate_module_list(module_outputs,self.module_output_list)
+        if module_outputs:
+            self.populate_module_list(module_outputs,self.module_output_list)
 
     def remove_output(self):
-        base_instance = self.module_instance
-        
-        output_cls = module_query.find_cls_module(self.module_output_list.selectedItems()[0].text())
-        output_instance = output_cls.create_from_name(self.module_output_list.selectedItems()[0].text())
-
-        if base_instance.allow_output:           
-            base_instance.remove_module_connection(base_instance,output_instance)
+        output_name = self.module_output_list.selectedItems()[0].text()
 
-        base_instance.remove_output_attr(output_instance.instance_module_name)
-        output_instance.remove_input_attr()
+        module_connections.rewire_modules({output_name: None})
 
         for i in range(self.module_output_list.count()):
-            if self.module_output_list.item(i).text() == output_instance.instance_module_name:
+            if self.module_output_list.item(i).text() == output_name:
                 self.module_output_list.takeItem(i)
                 break
 
         self.output_remove_button.setEnabled(False)
 
     def load_template(self):
-        file_path, _ = QFileDialog.getOpenFileName(
-            self,
-            "Load Rig Template",
-            "",
-            "JSON Files (*.json)"
-        )        
+        file_path = ui_template.get_open_path(self)
+        if not file_path:
+            return
+
+        if self.build_runner and self.build_runner.running:
+            module_error.send_warning("A template build is already running.")
+            return
+
+        #Templates are built in chunks by the build runner so the UI can show progress and allow cancelling.
+        data = module_template.read_template(file_path)
+        self.build_runner = module_build_runner.BuildRunner(data)
         
-        module_template.load_template(file_path)
+        self.build_progress = QProgressDialog("Loading rig template...", "Cancel", 0, 0, self)
+        self.build_progress.setMinimumDuration(0)
+        self.build_progress.canceled.connect(self.build_runner.cancel)
+        
+        self.build_runner.progress.connect(self.on_build_progress)
+        self.build_runner.finished.connect(self.on_build_finished)
+        self.build_runner.start()
+
+    def on_build_progress(self, step, total, label):
+        self.build_progress.setMaximum(total)
+        self.build_progress.setValue(step)
+        self.build_progress.setLabelText(label)
+
+    def on_build_finished(self, success):
+        self.build_progress.close()
+        
+        self.selected_module = None
+        self.module_instance = None
+        self.module_list.clear()
+        self.clear_module_lists()
+        self.disable_edit_buttons()
+        self.populate_modules_from_scene()
+
+        if not success:
+            module_error.send_warning("Template build did not complete. Partially built modules were removed.")
 
     def save_as_template(self):
-        module_template.save_as_template("human")
+        ui_template.save_as_template("human", self)
 
     def attach_bind(self):
         module_skeleton.connect_bind_skeleton()
@@ -0,0 +1,40 @@
+#Dialogs for saving and loading rig templates. The template module only takes paths, so every file dialog and message box
+#for it lives here, in the Module Builder UI.
+
+from PySide2.QtWidgets import QFileDialog, QMessageBox
+
+import autorig.control_rig.module.template as module_template
+
+def get_save_path(parent=None) -> str|None:
+    file_path, _ = QFileDialog.getSaveFileName(
+            parent,
+            "Save Rig Template",
+            "",
+            "JSON Files (*.json)"
+        )
+    if not file_path:
+        return None
+    return module_template.get_template_path(file_path)
+
+def get_open_path(parent=None) -> str|None:
+    file_path, _ = QFileDialog.getOpenFileName(
+            parent,
+            "Load Rig Template",
+            "",
+            "JSON Files (*.json)"
+        )
+    return file_path or None
+
+def save_as_template(template_name: str, parent=None) -> dict|None:
+    file_path = get_save_path(parent)
+    if not file_path:
+        return None
+
+    try:
+        data, _ = module_template.save_template(file_path, template_name)
+    except OSError as e:
+        QMessageBox.critical(parent, "Error", f"Failed to save file: {e}")
+        return None
+
+    QMessageBox.information(parent, "Success", f"File saved:\n{file_path}")
+    return data